@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+### benchmark_columnar.py
+# Bulk scoring benchmark: the same customers sent to /predict/batch as JSON and to
+# /predict/columnar as an Arrow IPC stream (and MessagePack when installed), through the
+# FastAPI TestClient. Reports end-to-end time (client encode + request + client decode),
+# payload sizes and rows/sec per format and batch size.
+
+# Imports
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Fix import path for local modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.serving import columnar
+from test_pipeline_phase3_serving import CATEGORIES
+
+# Synthetic customers built column-wise (same value ranges as make_records, fast for 1M rows)
+def make_columns(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({c: rng.choice(np.array(v, dtype=object), n) for c, v in CATEGORIES.items()})
+    df["tenure"] = rng.integers(0, 73, n)
+    df["MonthlyCharges"] = np.round(rng.uniform(18, 120, n), 2)
+    df["TotalCharges"] = np.round(df["MonthlyCharges"] * np.maximum(df["tenure"], 1), 2)
+    return df
+
+# Client side of each format: payload bytes, request headers, response decoder
+def json_request(df: pd.DataFrame):
+    body = json.dumps(df.to_dict("records")).encode()
+    return body, {"content-type": "application/json"}, lambda r: r.json()["predictions"]
+
+def arrow_request(df: pd.DataFrame):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    decode = lambda r: pa.ipc.open_stream(r.content).read_all()
+    return sink.getvalue().to_pybytes(), {"content-type": columnar.ARROW_STREAM}, decode
+
+def msgpack_request(df: pd.DataFrame):
+    import msgpack
+
+    payload = {}
+    for c in df.columns:
+        if df[c].dtype == object:
+            payload[c] = df[c].tolist()
+        else:
+            payload[c] = {"dtype": df[c].dtype.str, "data": df[c].to_numpy().tobytes()}
+    decode = lambda r: np.frombuffer(msgpack.unpackb(r.content)["churn_probability"]["data"], dtype="<f8")
+    return msgpack.packb(payload), {"content-type": columnar.MSGPACK}, decode
+
+FORMATS = {
+    "json": ("/predict/batch", json_request),
+    "arrow": ("/predict/columnar", arrow_request),
+    "msgpack": ("/predict/columnar", msgpack_request),
+}
+
+def main(args):
+
+    from fastapi.testclient import TestClient
+    from src.app.main import app
+    from src.serving import inference
+
+    inference.prediction_cache = None  # every row is scored
+
+    formats = list(args.formats)
+    if "msgpack" in formats:
+        try:
+            import msgpack  # noqa: F401
+        except ImportError:
+            print("msgpack is not installed, skipping the MessagePack format")
+            formats.remove("msgpack")
+
+    results = {}
+    with TestClient(app) as client:
+        while client.get("/ready").status_code != 200:
+            time.sleep(0.1)
+
+        print(f"{'format':<8} {'rows':>9} {'payload MB':>11} {'encode s':>9} {'request s':>10} "
+              f"{'total s':>9} {'rows/sec':>12}")
+        for size in args.sizes:
+            df = make_columns(size, seed=size)
+            for fmt in formats:
+                if fmt == "json" and size > args.json_max_rows:
+                    continue
+                path, build = FORMATS[fmt]
+                runs = []
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    body, headers, decode = build(df)
+                    t1 = time.perf_counter()
+                    response = client.post(path, content=body, headers=headers)
+                    if response.status_code != 200:
+                        raise RuntimeError(f"{fmt} request failed: {response.status_code} {response.text[:200]}")
+                    out = decode(response)
+                    t2 = time.perf_counter()
+                    if len(out) != size:
+                        raise RuntimeError(f"{fmt} returned {len(out)} predictions for {size} rows")
+                    runs.append((t1 - t0, t2 - t1, t2 - t0))
+                encode_s, request_s, total_s = np.median(np.array(runs), axis=0)
+                results[f"{fmt}/{size}"] = {
+                    "rows": size, "payload_bytes": len(body), "encode_s": encode_s,
+                    "request_s": request_s, "total_s": total_s, "rows_per_sec": size / total_s,
+                }
+                print(f"{fmt:<8} {size:>9} {len(body) / 1e6:>11.1f} {encode_s:>9.3f} {request_s:>10.3f} "
+                      f"{total_s:>9.3f} {size / total_s:>12,.0f}")
+
+    # speed-up of each columnar format over JSON at the same size
+    print("\nSpeed-up over JSON (end to end):")
+    for key, r in results.items():
+        fmt, size = key.split("/")
+        base = results.get(f"json/{size}")
+        if fmt != "json" and base:
+            print(f"   {key:<18} {base['total_s'] / r['total_s']:>6.1f}x")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.out}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Benchmark JSON vs columnar bulk scoring")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    p.add_argument("--formats", type=str, nargs="+", default=["json", "arrow", "msgpack"])
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--json_max_rows", type=int, default=1_000_000,
+                   help="largest batch sent as JSON (per-row parsing makes 1M rows take minutes)")
+    p.add_argument("--out", type=str, default=None, help="write results as JSON")
+
+    args = p.parse_args()
+    main(args)
+
+
+"""
+# Example:
+
+python scripts/benchmark_columnar.py --sizes 1000 100000 1000000 --out benchmarks/columnar.json
+
+"""
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+### benchmark_serving.py
+# Serving latency/throughput benchmark: times each stage of the prediction path in
+# isolation over a range of batch sizes, saves the results as JSON and optionally
+# fails when they regress against a stored baseline. Explanation cases (TreeSHAP) are
+# timed next to predict_batch and their cost is printed relative to it.
+
+# Imports
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import numpy as np
+import pandas as pd
+
+# Fix import path for local modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.serving import inference
+from test_pipeline_phase3_serving import make_records
+
+# Time fn() `repeat` times and summarize latency percentiles and throughput
+def measure(fn, rows: int, repeat: int) -> dict:
+    fn()  # warm-up
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    ms = np.array(times) * 1000
+    p50 = float(np.percentile(ms, 50))
+    return {
+        "rows": rows,
+        "repeat": repeat,
+        "p50_ms": p50,
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "rows_per_sec": rows / (p50 / 1000) if p50 > 0 else float("inf"),
+    }
+
+# Fewer repetitions for big batches so every size takes roughly the same time
+def repeats_for(size: int, args) -> int:
+    return int(max(args.min_repeat, min(args.repeat, args.rows_budget // size)))
+
+# Build the (stage, size) -> callable benchmark plan
+def build_cases(args):
+    m = inference.load_model(args.model_dir, args.backend)
+
+    client = None
+    if args.http_max_size > 0:
+        from fastapi.testclient import TestClient
+        from src.app.main import app
+        client = TestClient(app)
+
+    for size in args.sizes:
+        records = make_records(size, seed=size)
+        df = pd.DataFrame(records)
+        X = m.encoder.transform(records)
+
+        yield "serve_transform", size, lambda df=df: inference._serve_transform(df)
+        yield "encode_records", size, lambda r=records: m.encoder.transform(r)
+        yield "model_predict", size, lambda X=X: m.backend.predict_proba(X)
+        yield "predict_batch", size, lambda r=records: inference.predict_batch(r)
+        if size == 1:
+            yield "predict", size, lambda r=records[0]: inference.predict(r)
+        if size <= args.explain_max_size:
+            yield "explain_batch", size, lambda r=records: inference.explain_batch(r)
+
+        if client is not None and size <= args.http_max_size:
+            if size == 1:
+                yield "http_predict", size, lambda r=records[0]: client.post("/predict", json=r)
+            yield "http_predict_batch", size, lambda r=records: client.post("/predict/batch", json=r)
+            if size <= args.explain_max_size:
+                yield "http_explain", size, lambda r=records: client.post("/explain", json=r)
+
+# Compare against a baseline file: a case regresses when its p50 (or p95) grows by more than tolerance
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for key, cur in results.items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        for metric in ("p50_ms", "p95_ms"):
+            if cur[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{key} {metric}: {cur[metric]:.3f} ms vs baseline {base[metric]:.3f} ms "
+                    f"(+{(cur[metric] / base[metric] - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+def main(args):
+
+    # cached hits would hide the cost being measured
+    inference.prediction_cache = None
+    inference.explanation_cache = None
+
+    print(f"{'stage':<20} {'rows':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'rows/sec':>12}")
+    results = {}
+    for stage, size, fn in build_cases(args):
+        r = measure(fn, size, repeats_for(size, args))
+        results[f"{stage}/{size}"] = r
+        print(f"{stage:<20} {size:>8} {r['p50_ms']:>10.3f} {r['p95_ms']:>10.3f} "
+              f"{r['p99_ms']:>10.3f} {r['rows_per_sec']:>12,.0f}")
+
+    # explanation overhead: explain_batch vs predict_batch (and over HTTP) at the same batch size
+    overheads = {}
+    for key, r in results.items():
+        stage, size = key.split("/")
+        base = {"explain_batch": "predict_batch", "http_explain": "http_predict_batch"}.get(stage)
+        if base and f"{base}/{size}" in results:
+            overheads[key] = r["p50_ms"] / results[f"{base}/{size}"]["p50_ms"]
+    if overheads:
+        print("\nExplanation cost vs plain prediction (p50):")
+        for key, ratio in overheads.items():
+            print(f"   {key:<28} {ratio:>6.1f}x")
+
+    report = {
+        "meta": {
+            "backend": inference.get_model().backend.name,
+            "model_id": inference.get_model().model_id,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+        "explain_overhead": overheads,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nFAILED: {len(regressions)} regressions beyond {args.tolerance:.0%} of {args.baseline}")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\nPASSED: no regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Benchmark the serving path stage by stage")
+    p.add_argument("--model_dir", type=str, default=inference.MODEL_DIR)
+    p.add_argument("--backend", type=str, default=inference.SERVING_BACKEND)
+    p.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000, 100000])
+    p.add_argument("--repeat", type=int, default=200, help="max timed runs per case")
+    p.add_argument("--min_repeat", type=int, default=5, help="min timed runs per case")
+    p.add_argument("--rows_budget", type=int, default=1_000_000,
+                   help="rows processed per case, caps repeats for large batches")
+    p.add_argument("--http_max_size", type=int, default=10000,
+                   help="largest batch sent through the FastAPI TestClient (0 disables HTTP cases)")
+    p.add_argument("--explain_max_size", type=int, default=10000,
+                   help="largest batch for the explanation cases (0 disables them)")
+    p.add_argument("--out", type=str, default=None, help="write results as JSON")
+    p.add_argument("--baseline", type=str, default=None, help="baseline JSON to compare against")
+    p.add_argument("--tolerance", type=float, default=0.25,
+                   help="allowed slowdown vs baseline before failing (0.25 = 25%%)")
+
+    args = p.parse_args()
+    main(args)
+
+
+"""
+# Save a baseline, then check a later build against it:
+
+python scripts/benchmark_serving.py --out benchmarks/baseline.json
+python scripts/benchmark_serving.py --baseline benchmarks/baseline.json --tolerance 0.25
+
+"""
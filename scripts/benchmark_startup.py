@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+### benchmark_startup.py
+# Cold start budget check: time a fresh "import src.app.main" (what uvicorn does before
+# it can answer "/") and, optionally, the model load that gates /ready.
+
+# Imports
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+
+# "import time:   self [us] | cumulative | imported package" -> (cumulative, package)
+IMPORTTIME_LINE = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+# child process code: wall-clock of the app import, then of the model load
+IMPORT_CODE = """
+import time, json
+t0 = time.perf_counter()
+import src.app.main
+t1 = time.perf_counter()
+load_s = None
+if {load_model}:
+    from src.serving import inference
+    inference.load_model()
+    load_s = time.perf_counter() - t1
+print(json.dumps({{"import_s": t1 - t0, "load_s": load_s}}))
+"""
+
+# One cold start in a fresh interpreter
+def run_once(load_model: bool, importtime: bool) -> dict:
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", IMPORT_CODE.format(load_model=load_model)]
+
+    env = dict(os.environ, PYTHONPATH=str(project_root))
+    proc = subprocess.run(cmd, cwd=project_root, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"App import failed:\n{proc.stderr}")
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["stderr"] = proc.stderr
+    return result
+
+# Third-party / stdlib top-level packages ranked by cumulative import time
+def slowest_imports(stderr: str, top: int) -> list:
+    rows = []
+    for line in stderr.splitlines():
+        m = IMPORTTIME_LINE.match(line)
+        if m and "." not in m.group(2) and m.group(2) != "src":
+            rows.append((m.group(2), int(m.group(1)) / 1e6))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+
+def main(args):
+
+    runs = [run_once(args.load_model, importtime=False) for _ in range(args.repeat)]
+    import_s = statistics.median(r["import_s"] for r in runs)
+    print(f"App import: median {import_s:.3f}s over {args.repeat} runs "
+          f"(min {min(r['import_s'] for r in runs):.3f}s)")
+
+    load_s = None
+    if args.load_model:
+        load_s = statistics.median(r["load_s"] for r in runs)
+        print(f"Model load: median {load_s:.3f}s")
+
+    # one extra run with -X importtime to show where the time goes
+    top = slowest_imports(run_once(False, importtime=True)["stderr"], args.top)
+    print("\nSlowest top-level imports (cumulative):")
+    for name, seconds in top:
+        print(f"   {seconds:7.3f}s  {name}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "import_s": import_s,
+                "load_s": load_s,
+                "budget_s": args.budget,
+                "slowest_imports": top,
+            }, f, indent=2)
+
+    if import_s > args.budget:
+        print(f"\nFAILED: app import {import_s:.3f}s exceeds budget {args.budget:.3f}s")
+        sys.exit(1)
+    print(f"\nPASSED: app import {import_s:.3f}s within budget {args.budget:.3f}s")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Check the API cold start against an import-time budget")
+    p.add_argument("--budget", type=float, default=2.0,
+                   help="max median seconds for 'import src.app.main'")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--top", type=int, default=10, help="number of slow imports to list")
+    p.add_argument("--load_model", action="store_true",
+                   help="also time inference.load_model() (needs the model at MODEL_DIR)")
+    p.add_argument("--out", type=str, default=None, help="write results as JSON")
+
+    args = p.parse_args()
+    main(args)
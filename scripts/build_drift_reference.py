@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+### build_drift_reference.py
+# Build drift_reference.json for an existing model directory (e.g. the committed served model,
+# trained before run_pipeline.py saved one) from the raw training extract. The extract is
+# cleaned and encoded with the model's own encoder and split exactly like run_pipeline.py
+# (stratified, random_state=42, the run's test_size), so the snapshot covers the training rows.
+
+# Imports
+import os
+import sys
+import argparse
+from sklearn.model_selection import train_test_split
+
+# Fix import path for local modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data.load_data import load_data
+from src.data.preprocess import preprocess_data
+from src.serving.inference import _load_encoder
+from src.serving.drift import build_reference, save_reference, DRIFT_REFERENCE_FILE
+
+# feature_columns.txt / preprocessing.pkl and params/test_size live in different places in an
+# MLflow run directory (artifacts/, params/) and in the flat serving layout (/app/model)
+def _find(model_dir: str, *names) -> str:
+    for name in names:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"None of {names} found in {model_dir}")
+
+def main(args):
+
+    artifacts_dir = os.path.dirname(_find(args.model_dir, "feature_columns.txt",
+                                          os.path.join("artifacts", "feature_columns.txt")))
+    encoder = _load_encoder(artifacts_dir)
+
+    test_size = args.test_size
+    if test_size is None:
+        with open(_find(args.model_dir, os.path.join("params", "test_size"))) as f:
+            test_size = float(f.read().strip())
+
+    df = preprocess_data(load_data(args.input, typed=True), target_col=args.target)
+    X = encoder.transform_frame(df)
+    y = df[args.target]
+
+    # same row selection as run_pipeline.py's train/test split
+    X_train, _ = train_test_split(X, test_size=test_size, stratify=y, random_state=42)
+    reference = build_reference(X_train, encoder.feature_cols, encoder.numeric_cols)
+
+    out = args.out or os.path.join(artifacts_dir, DRIFT_REFERENCE_FILE)
+    save_reference(reference, out)
+    print(f"Saved drift reference for {len(X_train)} training rows ({len(encoder.feature_cols)} features) to {out}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Build the drift monitor's training snapshot for a model directory")
+    p.add_argument("--model_dir", type=str, required=True,
+                   help="MLflow run directory (artifacts/, params/) or flat serving model directory")
+    p.add_argument("--input", type=str, required=True, help="raw training extract the model was trained on")
+    p.add_argument("--target", type=str, default="Churn")
+    p.add_argument("--test_size", type=float, default=None, help="default: the run's params/test_size")
+    p.add_argument("--out", type=str, default=None,
+                   help=f"default: {DRIFT_REFERENCE_FILE} next to the model's feature_columns.txt")
+
+    args = p.parse_args()
+    main(args)
+
+
+"""
+# Example (committed served model):
+
+python scripts/build_drift_reference.py \\
+    --model_dir src/serving/model/m-9c85a6c242dd4d92816a9eac0fa568c7 \\
+    --input data/raw/Telco-Customer-Churn.csv
+
+"""
@@ -7,27 +7,37 @@ import pandas as pd
 # make src importable from this directory
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.data.cache import DatasetCache, cache_key
 from src.data.preprocess import preprocess_data
 from src.features.build_features import build_features
 
 RAW = "data/raw/Telco-Customer-Churn.csv"
 OUT = "data/processed/telco_churn_processed.csv"
+CACHE_DIR = "data/cache"
 
 ###
 # preprocessing pipeline
 ###
 
-df = pd.read_csv(RAW) #load raw
+# reuse the features built from the same raw file + data-prep code
+cache = DatasetCache(CACHE_DIR, cache_key(RAW, {"target": "Churn", "output": "build_features"}))
 
-df = preprocess_data(df, target_col="Churn") #preprocess
+if cache.has(frames=["features"]):
+    df_processed = cache.load_frame("features")
+    print(f"Loaded cached features {cache.key} (preprocessing and feature building skipped)")
+else:
+    df = pd.read_csv(RAW) #load raw
 
-if "Churn" in df.columns and df["Churn"].dtype == "object":
-    df["Churn"] = df["Churn"].str.strip().map({"No": 0, "Yes": 1}).astype("Int64") # ensure target is 0/1 only if still object
+    df = preprocess_data(df, target_col="Churn") #preprocess
 
-df_processed = build_features(df, target_col="Churn") # features engineering
+    if "Churn" in df.columns and df["Churn"].dtype == "object":
+        df["Churn"] = df["Churn"].str.strip().map({"No": 0, "Yes": 1}).astype("Int64") # ensure target is 0/1 only if still object
+
+    df_processed = build_features(df, target_col="Churn") # features engineering
+    cache.save_frame("features", df_processed)
 
 os.makedirs(os.path.dirname(OUT), exist_ok=True) # save data
 df_processed.to_csv(OUT, index=False)
 print(f"Processed dataset saved to {OUT} | Shape: {df_processed.shape}")
 
-### End
\ No newline at end of file
+### End
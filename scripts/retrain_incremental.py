@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+### retrain_incremental.py
+# Incremental retraining on a monthly delta: load the served model from its MLflow run, keep
+# boosting on the new rows only (xgb_model continuation), compare the updated model against the
+# current one on a rolling holdout (the newest rows) and register it only when the metrics hold.
+
+# Imports
+import os
+import sys
+import json
+import time
+import argparse
+import joblib
+import mlflow
+import mlflow.sklearn
+import pandas as pd
+from pathlib import Path
+from sklearn.metrics import precision_score, recall_score, f1_score, roc_auc_score
+
+# Fix import path for local modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data.load_data import load_data
+from src.data.preprocess import preprocess_data
+from src.features.build_features import FeatureEncoder
+from src.serving.encoder import BINARY_MAP
+from src.utils.validate_data import validate_telco_report
+from src.models.train import train_booster, peak_rss_mb
+from src.models.export_trees import export_tree_ensemble, TREE_MODEL_FILE
+from src.serving.drift import build_reference, extend_reference, save_reference, DRIFT_REFERENCE_FILE
+
+# Served model, its fitted encoder and its training params from the MLflow run
+def load_base_run(run_id: str):
+    run = mlflow.get_run(run_id)
+    model = mlflow.sklearn.load_model(f"runs:/{run_id}/model")
+
+    local_dir = mlflow.artifacts.download_artifacts(run_id=run_id)
+    preprocessing = joblib.load(os.path.join(local_dir, "preprocessing.pkl"))
+    reference_path = os.path.join(local_dir, DRIFT_REFERENCE_FILE)
+    reference = None  # runs logged before the drift snapshot existed
+    if os.path.exists(reference_path):
+        with open(reference_path) as f:
+            reference = json.load(f)
+    encoder = preprocessing.get("encoder")
+    if encoder is None:  # runs logged before the encoder was pickled
+        encoder = FeatureEncoder.from_feature_columns(preprocessing["feature_columns"], BINARY_MAP)
+        encoder.target_col = preprocessing["target"]
+    return run, model, preprocessing, encoder, reference
+
+# Validate, clean and encode new rows with the served encoder (never refitted)
+def prepare_rows(path: str, encoder: FeatureEncoder, target: str):
+    df = load_data(path, typed=True)
+    report = validate_telco_report(df)
+    if not report["valid"]:
+        raise ValueError(f"Data quality check failed for {path}. Issues: {report['failures']}")
+    df = preprocess_data(df, target_col=target)
+    X = pd.DataFrame(encoder.transform(df), columns=encoder.feature_cols, index=df.index)
+    return X, df[target].astype(int)
+
+# Threshold metrics used for the accept/reject decision
+def score(model, X, y, threshold: float) -> dict:
+    proba = model.predict_proba(X)[:, 1]
+    y_pred = (proba >= threshold).astype(int)
+    return {
+        "precision": precision_score(y, y_pred, zero_division=0),
+        "recall": recall_score(y, y_pred),
+        "f1": f1_score(y, y_pred),
+        "roc_auc": roc_auc_score(y, proba),
+    }
+
+def main(args):
+
+    project_root = Path(__file__).resolve().parent.parent
+    mlflow.set_tracking_uri(args.mlflow_uri or f"file:///{project_root.as_posix()}/mlruns")
+    mlflow.set_experiment(args.experiment)
+
+    print("\n=== 1. Loading served model ===")
+    base_run, base_model, preprocessing, encoder, base_reference = load_base_run(args.base_run_id)
+    target = preprocessing["target"]
+    threshold = float(base_run.data.params.get("threshold", 0.5))
+    base_trees = base_model.get_booster().num_boosted_rounds()
+    print(f"Base run {args.base_run_id}: {base_trees} trees, threshold {threshold}")
+
+    print("\n=== 2. Preparing new rows ===")
+    X_new, y_new = prepare_rows(args.new_data, encoder, target)
+
+    # Rolling holdout: a separate file, else the newest rows of the delta (file order is time order)
+    if args.holdout:
+        X_hold, y_hold = prepare_rows(args.holdout, encoder, target)
+    else:
+        # at least one holdout row and one training row (iloc[-0:] would hold out everything)
+        n_hold = max(1, int(len(X_new) * args.holdout_frac))
+        if len(X_new) - n_hold < 1:
+            sys.exit(f"Only {len(X_new)} new rows: too few to split off a holdout, pass a separate --holdout file")
+        X_hold, y_hold = X_new.iloc[-n_hold:], y_new.iloc[-n_hold:]
+        X_new, y_new = X_new.iloc[:-n_hold], y_new.iloc[:-n_hold]
+    print(f"New rows: {len(X_new)} | Holdout rows: {len(X_hold)}")
+    if y_hold.nunique() < 2:
+        sys.exit(f"The holdout ({len(X_hold)} rows) needs churned and retained customers to compare ROC AUC, "
+                 "pass a larger --holdout_frac or a separate --holdout file")
+
+    with mlflow.start_run():
+        mlflow.set_tags({"training_mode": "incremental", "base_run_id": args.base_run_id})
+        mlflow.log_params({
+            "model": "xgboost",
+            "threshold": threshold,
+            "base_trees": base_trees,
+            "new_rows": len(X_new),
+            "holdout_rows": len(X_hold),
+            "max_new_rounds": args.rounds,
+            "max_metric_drop": args.max_drop,
+        })
+
+        print("\n=== 3. Continuing boosting on the new rows ===")
+        # same hyperparameters as the served model, only the new rows are binned and boosted on
+        params = {k: v for k, v in base_model.get_xgb_params().items()
+                  if v is not None and k not in ("n_jobs", "random_state", "missing")}
+        params["eval_metric"] = params.get("eval_metric") or "logloss"
+        t0 = time.time()
+        try:
+            model, curves = train_booster(
+                X_new, y_new, params, num_boost_round=args.rounds, eval_size=args.eval_size,
+                early_stopping_rounds=args.early_stopping_rounds, xgb_model=base_model,
+            )
+        except ValueError as e:
+            # the stratified early-stopping split needs a few rows of each class
+            mlflow.set_tag("incremental_accepted", "false")
+            sys.exit(f"Cannot continue training on {len(X_new)} new rows: {e}")
+        train_time = time.time() - t0
+        n_trees = model.get_booster().num_boosted_rounds()
+        mlflow.log_metric("train_time", train_time)
+        mlflow.log_metric("n_trees", n_trees)
+        mlflow.log_metric("peak_rss_mb", peak_rss_mb())
+        print(f"Added {n_trees - base_trees} trees in {train_time:.2f} seconds ({n_trees} total)")
+
+        print("\n=== 4. Comparing on the rolling holdout ===")
+        before = score(base_model, X_hold, y_hold, threshold)
+        after = score(model, X_hold, y_hold, threshold)
+        for name in after:
+            mlflow.log_metric(f"base_{name}", before[name])
+            mlflow.log_metric(name, after[name])
+            print(f"   {name:<10} {before[name]:.3f} -> {after[name]:.3f}")
+
+        # accept when no gating metric drops by more than max_drop
+        regressions = [m for m in args.gate_metrics if after[m] < before[m] - args.max_drop]
+        accepted = not regressions
+        mlflow.set_tag("incremental_accepted", str(accepted).lower())
+
+        print("\n=== 5. Saving model ===")
+        # same artifact layout as run_pipeline, so the serving image can use either run
+        mlflow.sklearn.log_model(model, artifact_path="model")
+        mlflow.log_text("\n".join(encoder.feature_cols), artifact_file="feature_columns.txt")
+        artifacts_dir = os.path.join(project_root, "artifacts")
+        os.makedirs(artifacts_dir, exist_ok=True)
+        joblib.dump(preprocessing, os.path.join(artifacts_dir, "preprocessing.pkl"))
+        mlflow.log_artifact(os.path.join(artifacts_dir, "preprocessing.pkl"))
+        tree_model_path = export_tree_ensemble(model.get_booster(), os.path.join(artifacts_dir, TREE_MODEL_FILE))
+        mlflow.log_artifact(tree_model_path)
+
+        # drift snapshot for the served model: the base run's bins with the new training rows
+        # added (rebuilt from the new rows alone when the base run has none)
+        if base_reference is not None and base_reference["feature_cols"] == encoder.feature_cols:
+            reference = extend_reference(base_reference, X_new.to_numpy())
+        else:
+            reference = build_reference(X_new.to_numpy(), encoder.feature_cols, encoder.numeric_cols)
+        mlflow.log_artifact(save_reference(reference, os.path.join(artifacts_dir, DRIFT_REFERENCE_FILE)))
+        print(f"Drift reference covers {reference['rows']} training rows")
+
+        if not accepted:
+            print(f"Not registered: {', '.join(regressions)} dropped more than {args.max_drop} on the holdout")
+            return
+        if args.register_name:
+            version = mlflow.register_model(f"runs:/{mlflow.active_run().info.run_id}/model", args.register_name)
+            print(f"Registered {args.register_name} version {version.version}")
+        else:
+            print("Metrics held; pass --register_name to register the model")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Continue training the served churn model on new rows")
+    p.add_argument("--base_run_id", type=str, required=True, help="MLflow run of the currently served model")
+    p.add_argument("--new_data", type=str, required=True, help="CSV/Parquet with the new labelled customers")
+    p.add_argument("--holdout", type=str, default=None,
+                   help="labelled rolling holdout file (default: the newest --holdout_frac of --new_data)")
+    p.add_argument("--holdout_frac", type=float, default=0.2)
+    p.add_argument("--rounds", type=int, default=100, help="max boosting rounds added on top of the base model")
+    p.add_argument("--eval_size", type=float, default=0.1)
+    p.add_argument("--early_stopping_rounds", type=int, default=20)
+    p.add_argument("--gate_metrics", type=str, nargs="+", default=["roc_auc", "recall"])
+    p.add_argument("--max_drop", type=float, default=0.005,
+                   help="largest allowed drop of any gate metric vs the served model")
+    p.add_argument("--register_name", type=str, default=None, help="registered model name")
+    p.add_argument("--experiment", type=str, default="Telco Churn")
+    p.add_argument("--mlflow_uri", type=str, default=None)
+
+    args = p.parse_args()
+    main(args)
+
+
+"""
+# Example (monthly delta):
+
+python scripts/retrain_incremental.py \\
+    --base_run_id <served run id> \\
+    --new_data data/raw/telco_delta_2026_10.csv \\
+    --register_name telco-churn
+
+"""
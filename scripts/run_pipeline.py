@@ -15,16 +15,89 @@ from sklearn.metrics import (
     classification_report, precision_score, recall_score,
     f1_score, roc_auc_score
 )
-from xgboost import XGBClassifier
 
 # Fix import path for local modules -> Allows imports from src/ directory structure
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Core pipeline components
 from src.data.load_data import load_data
+from src.data.cache import DatasetCache, cache_key
 from src.data.preprocess import preprocess_data
-from src.features.build_features import build_features
-from src.utils.validate_data import validate_telco_data
+from src.features.build_features import FeatureEncoder
+from src.utils.validate_data import validate_telco_report
+from src.models.export_trees import export_tree_ensemble, TREE_MODEL_FILE
+from src.serving.drift import build_reference, save_reference, DRIFT_REFERENCE_FILE
+from src.serving.audit import training_columns
+from src.models.train import train_booster, peak_rss_mb
+
+# Log per-round train/eval curves in batched requests (MLflow accepts up to 1000 metrics per batch)
+def log_training_curves(curves: dict):
+    from mlflow.entities import Metric
+    timestamp = int(time.time() * 1000)
+    metrics = [
+        Metric(f"{split}_{name}", float(value), timestamp, step)
+        for split, by_metric in curves.items()
+        for name, values in by_metric.items()
+        for step, value in enumerate(values)
+    ]
+    client = mlflow.tracking.MlflowClient()
+    run_id = mlflow.active_run().info.run_id
+    for i in range(0, len(metrics), 1000):
+        client.log_batch(run_id, metrics=metrics[i:i + 1000])
+
+# Data loading, validation, preprocessing and feature building (pipeline steps 1-3)
+def prepare_data(args, project_root):
+
+    # Data Loading & Validation
+    print("\n=== 1. Loading data ===")
+    # Prediction audit files (src/serving/audit.py) are read without their audit_* columns
+    audit_columns = training_columns(args.input)
+    df = load_data(args.input, columns=audit_columns, typed=True)  # Load raw CSV with the typed schema (categoricals + float32 charges)
+    if audit_columns is not None and args.target in df.columns:
+        unlabeled = df[args.target].isna()
+        df = df[~unlabeled].reset_index(drop=True)  # outcome not joined yet
+        print(f"Audit log input: skipped {int(unlabeled.sum())} rows without a {args.target} outcome")
+    print(f"Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+
+    # Data Quality Validation (vectorized checks, full per-check report logged to MLflow)
+    print("Validating data quality...")
+    report = validate_telco_report(df, sample=args.validation_sample or None)
+    is_valid = report["valid"]
+    mlflow.log_metric("data_quality_pass", int(is_valid))  # Track data quality over time
+    mlflow.log_dict(report, artifact_file="data_validation.json")
+
+    if not is_valid:
+        # failing checks with row counts and example row indices are in data_validation.json
+        raise ValueError(f"Data quality check failed. Issues: {report['failures']}")
+    else:
+        print("Data validation passed. Logged to MLflow.")
+
+    # breakpoint()
+
+    # Data Preprocessing
+    print("\n=== 2. Preprocessing data ===")
+    df = preprocess_data(df)  # Basic cleaning
+
+    # Save processed dataset for reproducibility and debugging
+    processed_path = os.path.join(project_root, "data", "processed", "telco_churn_processed.csv")
+    os.makedirs(os.path.dirname(processed_path), exist_ok=True)
+    df.to_csv(processed_path, index=False)
+    print(f"Processed dataset saved to {processed_path} | Shape: {df.shape}")
+
+    # Feature Engineering
+    print("\n=== 3. Building features ===")
+    target = args.target
+    if target not in df.columns:
+        raise ValueError(f"Target column '{target}' not found in data")
+    encoder = FeatureEncoder(target_col=target).fit(df)  # learns binary + one-hot categories once
+    df_enc = encoder.transform_frame(df)                 # Binary encoding + one-hot encoding
+    
+    # Convert boolean columns to integers
+    for c in df_enc.select_dtypes(include=["bool"]).columns:
+        df_enc[c] = df_enc[c].astype(int)
+    print(f"Feature engineering completed: {df_enc.shape[1]} features")
+
+    return df, df_enc, encoder
 
 def main(args):
     
@@ -51,47 +124,34 @@ def main(args):
         mlflow.log_param("threshold", args.threshold)
         mlflow.log_param("test_size", args.test_size)
 
-        # Data Loading & Validation
-        print("\n=== 1. Loading data ===")
-        df = load_data(args.input)  # Load raw CSV data with error handling
-        print(f"Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
-
-        # Data Quality Validation
-        print("Validating data quality with Pandera...")
-        is_valid, failed = validate_telco_data(df)
-        mlflow.log_metric("data_quality_pass", int(is_valid))  # Track data quality over time
-
-        if not is_valid:
-            # Log validation failures for debugging
-            import json
-            mlflow.log_text(json.dumps(failed, indent=2), artifact_file="failed_pandera.json")
-            raise ValueError(f"Data quality check failed. Issues: {failed}")
+        # Data Preparation: reuse validated, preprocessed and encoded frames from the data cache
+        # when the raw file, the data-prep code and the target are unchanged
+        target = args.target
+        t_prep = time.time()
+        data_cache = None
+        if not args.no_cache:
+            key = cache_key(args.input, {"target": target, "validation_sample": args.validation_sample})
+            data_cache = DatasetCache(os.path.join(project_root, args.cache_dir), key)
+            mlflow.set_tag("data_cache_key", key)
+
+        if data_cache is not None and data_cache.has(frames=["features"], objects=["encoder"]):
+            print("\n=== 1-3. Loading prepared data from cache ===")
+            df_enc = data_cache.load_frame("features")
+            encoder = data_cache.load_object("encoder")
+            mlflow.set_tags({"data_cache": "hit", "skipped_stages": "validate,preprocess,build_features"})
+            mlflow.log_metric("data_quality_pass", 1)  # only data that passed validation is cached
+            print(f"Data cache hit ({data_cache.key}): skipped validation, preprocessing and feature building")
         else:
-            print("Data validation passed. Logged to MLflow.")
-
-        # breakpoint()
+            df, df_enc, encoder = prepare_data(args, project_root)
+            mlflow.set_tag("data_cache", "miss" if data_cache is not None else "off")
+            if data_cache is not None:
+                data_cache.save_frame("processed", df)
+                data_cache.save_frame("features", df_enc)
+                data_cache.save_object("encoder", encoder)
+                print(f"Saved prepared data to cache {data_cache.dir}")
 
-        # Data Preprocessing
-        print("\n=== 2. Preprocessing data ===")
-        df = preprocess_data(df)  # Basic cleaning
-
-        # Save processed dataset for reproducibility and debugging
-        processed_path = os.path.join(project_root, "data", "processed", "telco_churn_processed.csv")
-        os.makedirs(os.path.dirname(processed_path), exist_ok=True)
-        df.to_csv(processed_path, index=False)
-        print(f"Processed dataset saved to {processed_path} | Shape: {df.shape}")
-
-        # Feature Engineering
-        print("\n=== 3. Building features ===")
-        target = args.target
-        if target not in df.columns:
-            raise ValueError(f"Target column '{target}' not found in data")
-        df_enc = build_features(df, target_col=target)  # Binary encoding + one-hot encoding
-        
-        # Convert boolean columns to integers
-        for c in df_enc.select_dtypes(include=["bool"]).columns:
-            df_enc[c] = df_enc[c].astype(int)
-        print(f"Feature engineering completed: {df_enc.shape[1]} features")
+        mlflow.log_metric("data_prep_time", time.time() - t_prep)
+        print(f"Data preparation took {time.time() - t_prep:.2f} seconds | Features: {df_enc.shape[1]}")
 
         # Save Feature Metadata for Serving Consistency
         import json, joblib
@@ -111,7 +171,8 @@ def main(args):
         # Save preprocessing artifacts for serving pipeline
         preprocessing_artifact = {
             "feature_columns": feature_cols,  # Exact feature order
-            "target": target                  # Target column name
+            "target": target,                 # Target column name
+            "encoder": encoder                # Fitted FeatureEncoder, reused by the serving path
         }
         joblib.dump(preprocessing_artifact, os.path.join(artifacts_dir, "preprocessing.pkl"))
         mlflow.log_artifact(os.path.join(artifacts_dir, "preprocessing.pkl"))
@@ -131,6 +192,10 @@ def main(args):
         )
         print(f"Train: {X_train.shape[0]} samples | Test: {X_test.shape[0]} samples")
 
+        # Training distribution snapshot for the serving drift monitor (src/serving/drift.py)
+        reference = build_reference(X_train.to_numpy(), feature_cols, encoder.numeric_cols)
+        mlflow.log_artifact(save_reference(reference, os.path.join(artifacts_dir, DRIFT_REFERENCE_FILE)))
+
         # Handle Class Imbalance
         # Calculate scale_pos_weight to handle imbalanced dataset
         # This tells XGBoost to give more weight to the minority class (churners)
@@ -138,37 +203,48 @@ def main(args):
         print(f"Class imbalance ratio: {scale_pos_weight:.2f} (applied to positive class)")
 
         # Model Training with Optimized Hyperparameters
+        # hist trees on a QuantileDMatrix built once, early stopping on a held-out slice of the
+        # train split; the saved model keeps only the trees up to the best iteration
         print("\n=== 5. Training XGBoost model ===")
         
-        model = XGBClassifier(
+        params = {
             # Tree structure parameters (OPTIMIZED)
-            n_estimators=420,
-            learning_rate=0.12105134838892777, 
-            max_depth=3,
+            "learning_rate": 0.12105134838892777, 
+            "max_depth": 3,
             
             # Regularization parameters
-            subsample=0.9946570983423584,
-            colsample_bytree=0.5617518784757857,
-            min_child_weight = 1,
-            gamma=3.2328515123225703, 
-            reg_alpha=4.979554238456605, 
-            reg_lambda=0.5805809284683919,
+            "subsample": 0.9946570983423584,
+            "colsample_bytree": 0.5617518784757857,
+            "min_child_weight": 1,
+            "gamma": 3.2328515123225703, 
+            "reg_alpha": 4.979554238456605, 
+            "reg_lambda": 0.5805809284683919,
             
-            # Performance parameters
-            n_jobs=-1,
-            random_state=42,
-            eval_metric="logloss",
+            # Early stopping metric
+            "eval_metric": "logloss",
             
             # Handle class imbalance
-            scale_pos_weight=scale_pos_weight  # Weight for positive class (churners)
-        )
+            "scale_pos_weight": scale_pos_weight  # Weight for positive class (churners)
+        }
 
         # Train Model and Track Training Time
         t0 = time.time()
-        model.fit(X_train, y_train)
+        model, curves = train_booster(
+            X_train, y_train, params,
+            num_boost_round=args.max_rounds,               # upper bound, early stopping picks the count
+            eval_size=args.eval_size,
+            early_stopping_rounds=args.early_stopping_rounds,
+        )
         train_time = time.time() - t0
+        n_trees = model.get_booster().num_boosted_rounds()
         mlflow.log_metric("train_time", train_time)  # Track training performance
-        print(f"Model trained in {train_time:.2f} seconds")
+        mlflow.log_params({"max_rounds": args.max_rounds, "eval_size": args.eval_size,
+                           "early_stopping_rounds": args.early_stopping_rounds, "tree_method": "hist"})
+        mlflow.log_param("best_iteration", n_trees - 1)
+        mlflow.log_metric("n_trees", n_trees)
+        log_training_curves(curves)
+        mlflow.log_metric("peak_rss_mb", peak_rss_mb())  # peak memory of data prep + training
+        print(f"Model trained in {train_time:.2f} seconds | {n_trees} trees (best iteration {n_trees - 1})")
 
         # Model Evaluation 
         print("\n=== 6. Evaluating model performance ===")
@@ -210,6 +286,11 @@ def main(args):
         )
         print("Model saved to MLflow for serving pipeline")
 
+        # Export flattened tree arrays next to feature_columns.txt for the NumPy serving backend
+        tree_model_path = export_tree_ensemble(model.get_booster(), os.path.join(artifacts_dir, TREE_MODEL_FILE))
+        mlflow.log_artifact(tree_model_path)
+        print(f"Exported {model.get_booster().num_boosted_rounds()} trees to {tree_model_path}")
+
         # === Final Performance Summary ===
         print(f"\n Performance Summary:")
         print(f"   Training time: {train_time:.2f}s")
@@ -223,13 +304,24 @@ def main(args):
 if __name__ == "__main__":
     p = argparse.ArgumentParser(description="Run churn pipeline with XGBoost + MLflow")
     p.add_argument("--input", type=str, required=True,
-                   help="path to CSV (e.g., data/raw/Telco-Customer-Churn.csv)")
+                   help="path to CSV/Parquet (e.g., data/raw/Telco-Customer-Churn.csv) or a directory of prediction audit files")
     p.add_argument("--target", type=str, default="Churn")
     p.add_argument("--threshold", type=float, default=0.30)
     p.add_argument("--test_size", type=float, default=0.2)
     p.add_argument("--experiment", type=str, default="Telco Churn")
     p.add_argument("--mlflow_uri", type=str, default=None,
                     help="override MLflow tracking URI, else uses project_root/mlruns")
+    p.add_argument("--max_rounds", type=int, default=420,
+                    help="upper bound on boosting rounds (early stopping usually stops sooner)")
+    p.add_argument("--eval_size", type=float, default=0.1,
+                    help="fraction of the train split held out for early stopping")
+    p.add_argument("--early_stopping_rounds", type=int, default=30)
+    p.add_argument("--cache_dir", type=str, default=os.path.join("data", "cache"),
+                    help="data-prep cache directory, relative to the project root")
+    p.add_argument("--validation_sample", type=float, default=0,
+                    help="validate a random sample of rows (count, or fraction if < 1); 0 validates every row")
+    p.add_argument("--no_cache", action="store_true",
+                    help="always rerun validation, preprocessing and feature building")
 
     args = p.parse_args()
     main(args)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+### score_file.py
+# Offline bulk scoring: stream a customer CSV/Parquet extract through the same cleaning,
+# serving encoder and model as the API, writing predictions chunk by chunk.
+
+# Imports
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+# Fix import path for local modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.data.load_data import load_data
+from src.data.preprocess import preprocess_data
+from src.serving import inference
+
+# Stream the input file as typed DataFrame chunks (categoricals + float32 charges)
+def read_chunks(path: str, chunksize: int):
+    yield from load_data(path, typed=True, chunksize=chunksize)
+
+# Incremental writer for CSV (append) or Parquet (one row group per chunk)
+class ChunkWriter:
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._header = True
+
+    def write(self, df: pd.DataFrame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+# Load the serving model in each pool worker (and in the parent when running serially)
+def init_model(model_dir: str, backend: str):
+    inference.load_model(model_dir, backend)
+
+# Clean, encode and score one chunk
+def score_chunk(chunk: pd.DataFrame, id_col: str) -> pd.DataFrame:
+    m = inference.get_model()
+
+    out = pd.DataFrame(index=chunk.index)
+    if id_col in chunk.columns:
+        out[id_col] = chunk[id_col].to_numpy()
+
+    df = preprocess_data(chunk)  # same cleaning as training (ids/target dropped if present)
+    X = m.encoder.transform_frame(df)
+    proba = m.backend.predict_proba(X)
+
+    out["churn_probability"] = proba
+    out["churn_prediction"] = (proba >= m.threshold).astype(int)
+    return out
+
+def main(args):
+
+    writer = ChunkWriter(args.output)
+    total_rows = 0
+    t0 = time.perf_counter()
+
+    def report(scored: pd.DataFrame):
+        nonlocal total_rows
+        writer.write(scored)
+        total_rows += len(scored)
+        elapsed = time.perf_counter() - t0
+        print(f"Scored {total_rows} rows | {total_rows / elapsed:,.0f} rows/sec")
+
+    try:
+        if args.workers <= 1:
+            init_model(args.model_dir, args.backend)
+            for chunk in read_chunks(args.input, args.chunksize):
+                report(score_chunk(chunk, args.id_col))
+        else:
+            # at most 2 chunks per worker in flight keeps memory bounded; results are
+            # written in input order
+            with ProcessPoolExecutor(args.workers, initializer=init_model,
+                                     initargs=(args.model_dir, args.backend)) as pool:
+                pending = []
+                for chunk in read_chunks(args.input, args.chunksize):
+                    pending.append(pool.submit(score_chunk, chunk, args.id_col))
+                    if len(pending) >= 2 * args.workers:
+                        report(pending.pop(0).result())
+                for future in pending:
+                    report(future.result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - t0
+    print(f"\nWrote {total_rows} predictions to {args.output} in {elapsed:.2f}s "
+          f"({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Score a customer CSV/Parquet file in chunks")
+    p.add_argument("--input", type=str, required=True, help="customer extract (.csv or .parquet)")
+    p.add_argument("--output", type=str, required=True, help="predictions file (.csv or .parquet)")
+    p.add_argument("--model_dir", type=str, default=inference.MODEL_DIR)
+    p.add_argument("--backend", type=str, default=inference.SERVING_BACKEND,
+                   help="booster, trees or pyfunc")
+    p.add_argument("--chunksize", type=int, default=100_000)
+    p.add_argument("--workers", type=int, default=1, help="processes scoring chunks in parallel")
+    p.add_argument("--id_col", type=str, default="customerID",
+                   help="column copied to the output to identify each row")
+
+    args = p.parse_args()
+    main(args)
+
+
+"""
+# Example:
+
+python scripts/score_file.py \\
+    --input data/raw/Telco-Customer-Churn.csv \\
+    --output data/scored/churn_scores.parquet \\
+    --workers 4
+
+"""
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+### serve_workers.py
+# Pre-forking server: the parent imports the app and loads the model artifacts once,
+# then forks uvicorn workers that share them copy-on-write on one listening socket.
+# With --shared_dir the tree tables are exported as .npy files and memory-mapped, so
+# their pages stay shared even after workers touch them. Unix only (os.fork).
+
+# Imports
+import os
+import sys
+import gc
+import time
+import signal
+import socket
+import argparse
+import psutil
+import uvicorn
+
+# Fix import path for local modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.app.main import app
+from src.serving import inference
+from src.serving.shared import export_shared_model
+from src.serving.utils import stop_logging
+
+# Run one uvicorn worker on the inherited socket (never returns to the parent's code)
+def run_worker(sock, args):
+    config = uvicorn.Config(app, log_level=args.log_level)
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    stop_logging()  # os._exit skips atexit: write out the worker's queued log records
+    os._exit(0)
+
+# Per-worker memory: RSS counts shared pages in every process, USS only the worker's own
+def report_memory(pids):
+    print(f"{'pid':>8} {'rss_mb':>8} {'uss_mb':>8} {'shared_mb':>10}")
+    for pid in pids:
+        try:
+            mem = psutil.Process(pid).memory_full_info()
+        except psutil.Error as e:
+            print(f"{pid:>8} unavailable ({e})")
+            continue
+        print(f"{pid:>8} {mem.rss / 2**20:8.1f} {mem.uss / 2**20:8.1f} {mem.shared / 2**20:10.1f}")
+    parent = psutil.Process().memory_full_info()
+    print(f"{'parent':>8} {parent.rss / 2**20:8.1f} {parent.uss / 2**20:8.1f} {parent.shared / 2**20:10.1f}")
+
+def main(args):
+
+    # Load everything once in the parent (no predictions here: XGBoost's OpenMP pool
+    # must not be started before forking)
+    t0 = time.perf_counter()
+    if args.shared_dir:
+        export_shared_model(inference.MODEL_DIR, args.shared_dir)
+        print(f"Exported memory-mappable model tables to {args.shared_dir}")
+        inference.load_model(args.shared_dir, "trees")
+    else:
+        inference.load_model()
+    print(f"Parent loaded model in {time.perf_counter() - t0:.2f}s")
+
+    # keep the GC from touching (and so un-sharing) the objects loaded so far
+    gc.freeze()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    pids = []
+    for _ in range(args.workers):
+        t_fork = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            run_worker(sock, args)
+        pids.append(pid)
+        print(f"Forked worker {pid} in {(time.perf_counter() - t_fork) * 1000:.2f} ms")
+
+    print(f"Serving on http://{args.host}:{args.port} with {len(pids)} workers")
+
+    # forward shutdown to the workers
+    def stop(signum, frame):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    time.sleep(args.report_after)
+    report_memory(pids)
+
+    for pid in pids:
+        os.waitpid(pid, 0)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Serve the churn API from pre-forked workers sharing one model")
+    p.add_argument("--host", type=str, default="0.0.0.0")
+    p.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)))
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--shared_dir", type=str, default=None,
+                   help="export .npy tree tables here and serve them memory-mapped "
+                        "with the trees backend (e.g. /dev/shm/telco-churn)")
+    p.add_argument("--report_after", type=float, default=5.0,
+                   help="seconds to wait before printing per-worker memory")
+    p.add_argument("--log_level", type=str, default="info")
+
+    args = p.parse_args()
+    main(args)
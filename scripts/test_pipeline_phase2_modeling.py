@@ -4,7 +4,13 @@
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from xgboost import XGBClassifier
-import optuna
+from sklearn.metrics import recall_score
+import os, sys
+
+# make src importable from this directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.models.tune import tune_model
 
 print("Phase 2: Modeling with XGBoost")
 
@@ -26,30 +32,21 @@ X_train, X_test, y_train, y_test = train_test_split(
 
 THRESHOLD = 0.4 
 
-def objective(trial):
-    params = {
-        "n_estimators": trial.suggest_int("n_estimators", 300, 800),
-        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.2),
-        "max_depth": trial.suggest_int("max_depth", 3, 10),
-        "subsample": trial.suggest_float("subsample", 0.5, 1.0),
-        "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
-        "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
-        "gamma": trial.suggest_float("gamma", 0, 5),
-        "reg_alpha": trial.suggest_float("reg_alpha", 0, 5),
-        "reg_lambda": trial.suggest_float("reg_lambda", 0, 5),
-        "random_state": 42,
-        "n_jobs": -1,
-        "scale_pos_weight": (y_train == 0).sum() / (y_train == 1).sum(),
-        "eval_metric": "logloss",
-    }
-    model = XGBClassifier(**params)
-    model.fit(X_train, y_train)
-    proba = model.predict_proba(X_test)[:, 1]
-    y_pred = (proba >= THRESHOLD).astype(int)
-    from sklearn.metrics import recall_score
-    return recall_score(y_test, y_pred, pos_label=1)
-
-study = optuna.create_study(direction="maximize")
-study.optimize(objective, n_trials=30)
-print("Best Params:", study.best_params)
-print("Best Recall:", study.best_value)
\ No newline at end of file
+# Parallel, pruned tuning on cached CV folds of the training split;
+# the study is stored in SQLite so an interrupted run resumes where it stopped
+best_params = tune_model(
+    X_train, y_train,
+    n_trials=30,
+    threshold=THRESHOLD,
+    scale_pos_weight=(y_train == 0).sum() / (y_train == 1).sum(),
+    space="full",
+    storage="sqlite:///optuna_phase2.db",
+    study_name="phase2-recall",
+)
+
+# Recall of the tuned parameters on the holdout split
+model = XGBClassifier(**best_params, random_state=42, n_jobs=-1, eval_metric="logloss",
+                      scale_pos_weight=(y_train == 0).sum() / (y_train == 1).sum())
+model.fit(X_train, y_train)
+y_pred = (model.predict_proba(X_test)[:, 1] >= THRESHOLD).astype(int)
+print("Holdout Recall:", recall_score(y_test, y_pred, pos_label=1))
@@ -0,0 +1,104 @@
+### test_pipeline_phase3_serving.py
+
+# Imports
+import os
+import sys
+import shutil
+import tempfile
+import numpy as np
+
+# make src importable from this directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.serving.backends import load_backend
+from src.serving.encoder import CompiledEncoder
+from src.serving.drift import build_reference, save_reference, DRIFT_REFERENCE_FILE
+from src.serving.inference import ServingModel
+from src.serving.shared import export_shared_model
+
+# config
+MODEL_DIR = os.environ.get("MODEL_DIR", "/app/model")
+N_ROWS = 5000
+
+# value sets accepted by the API (see CustomerData in src/app/main.py)
+CATEGORIES = {
+    "gender": ["Male", "Female"],
+    "Partner": ["Yes", "No"],
+    "Dependents": ["Yes", "No"],
+    "PhoneService": ["Yes", "No"],
+    "MultipleLines": ["Yes", "No", "No phone service"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "OnlineSecurity": ["Yes", "No", "No internet service"],
+    "OnlineBackup": ["Yes", "No", "No internet service"],
+    "DeviceProtection": ["Yes", "No", "No internet service"],
+    "TechSupport": ["Yes", "No", "No internet service"],
+    "StreamingTV": ["Yes", "No", "No internet service"],
+    "StreamingMovies": ["Yes", "No", "No internet service"],
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "PaperlessBilling": ["Yes", "No"],
+    "PaymentMethod": ["Electronic check", "Mailed check",
+                      "Bank transfer (automatic)", "Credit card (automatic)"],
+}
+
+# random but valid customer records
+def make_records(n, seed=42):
+    rng = np.random.default_rng(seed)
+    records = []
+    for _ in range(n):
+        rec = {c: str(rng.choice(v)) for c, v in CATEGORIES.items()}
+        rec["tenure"] = int(rng.integers(0, 73))
+        rec["MonthlyCharges"] = float(round(rng.uniform(18, 120), 2))
+        rec["TotalCharges"] = float(round(rec["MonthlyCharges"] * max(rec["tenure"], 1), 2))
+        records.append(rec)
+    return records
+
+def main():
+
+    print("Testing Phase 3: Serving backends parity")
+
+    # 1. Encode records
+    print("\n[1] Encoding records...")
+    encoder = CompiledEncoder.from_file(os.path.join(MODEL_DIR, "feature_columns.txt"))
+    X = encoder.transform(make_records(N_ROWS))
+    print(f"Encoded matrix shape: {X.shape}")
+
+    # 2. Score with every backend
+    print("\n[2] Scoring with pyfunc, booster and trees backends...")
+    reference = load_backend(MODEL_DIR, "pyfunc").predict_proba(X)
+    booster_backend = load_backend(MODEL_DIR, "booster")
+    booster = booster_backend.predict_proba(X)
+    trees_backend = load_backend(MODEL_DIR, "trees")
+    trees = trees_backend.predict_proba(X)
+
+    # 3. Compare
+    print("\n[3] Comparing probabilities...")
+    assert np.array_equal(reference, booster), (
+        f"booster backend differs from pyfunc: max abs diff {np.abs(reference - booster).max()}"
+    )
+    print(f"booster backend matches pyfunc on {len(X)} rows")
+
+    # margins must match exactly, the sigmoid may differ by one float32 ulp (expf vs NumPy exp)
+    margin = booster_backend.booster.inplace_predict(X, predict_type="margin", validate_features=False)
+    assert np.array_equal(margin, trees_backend.ensemble.predict_margin(X)), "trees backend margins differ"
+    assert np.allclose(trees, reference, rtol=0, atol=np.finfo(np.float32).eps), "trees backend differs"
+    print(f"trees backend matches pyfunc on {len(X)} rows (max abs diff {np.abs(trees - reference).max():.1e})")
+
+    # 4. Shared-directory workers (scripts/serve_workers.py --shared_dir) keep drift monitoring
+    print("\n[4] Exporting a shared model directory with a drift snapshot...")
+    with tempfile.TemporaryDirectory() as tmp:
+        model_dir = os.path.join(tmp, "model")
+        shutil.copytree(MODEL_DIR, model_dir)
+        if not os.path.exists(os.path.join(model_dir, DRIFT_REFERENCE_FILE)):
+            save_reference(build_reference(X, encoder.feature_cols, encoder.numeric_cols),
+                           os.path.join(model_dir, DRIFT_REFERENCE_FILE))
+        shared_dir = export_shared_model(model_dir, os.path.join(tmp, "shared"))
+        worker_model = ServingModel(shared_dir, "trees")
+        assert worker_model.drift is not None, "shared-dir worker has drift monitoring disabled"
+        worker_model.drift.update(X)
+        report = worker_model.drift.report()
+        print(f"shared-dir worker reports drift on {len(report['features'])} features")
+
+    print("\nPhase 3 serving checks completed successfully!")
+
+if __name__ == "__main__":
+    main()
@@ -43,7 +43,7 @@ class CustomerData(BaseModel):
 def api_predict(data: CustomerData):
     try:
         out = predict(data.dict())
-        return {"prediction": out}
+        return out
     except Exception as e:
         return {"error": str(e)}
 
@@ -75,7 +75,7 @@ def gradio_interface(
         "TotalCharges": float(TotalCharges),
     }
     out = predict(payload)
-    return str(out)
+    return f"{out['prediction']} ({out['churn_probability']:.1%})"
 
 demo = gr.Interface(
     fn=gradio_interface,
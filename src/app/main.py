@@ -1,23 +1,185 @@
 ### main.py
 
 # Imports
-from fastapi import FastAPI
+import os
+import hmac
+import time
+import asyncio
+import itertools
+from contextlib import asynccontextmanager, AsyncExitStack
+from typing import List
+from fastapi import FastAPI, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from pydantic import BaseModel
-import gradio as gr
-from src.serving.inference import predict  # inference function
+from src.serving import inference
+from src.serving.batcher import MicroBatcher
+from src.serving.metrics import REGISTRY, STAGE_SECONDS, Counter, Histogram
+from src.serving.inference import predict_batch, explain_batch  # inference functions
+from src.serving.explain import DEFAULT_TOP_K
+from src.serving import columnar
+from src.serving.audit import AuditSink, AUDIT_DIR
+from src.utils.validate_data import telco_validator, request_validator
+from src.serving.utils import get_logger, EventLogger, request_sampler
+
+log = get_logger("api")
+request_log = EventLogger("api.requests")
+
+# Gradio UI startup mode: "lazy" (import + mount on the first /ui request), "eager" or "off"
+UI_MODE = os.environ.get("UI_MODE", "lazy")
+UI_PATH = "/ui"
+
+# Opt-in micro-batching of concurrent /predict requests
+PREDICT_BATCHING = os.environ.get("PREDICT_BATCHING", "0") == "1"
+BATCH_MAX_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", "2"))
+_batcher = None
+
+# Domain checks on request payloads (allowed values, ranges) on top of Pydantic's type checks:
+# "warn" (count invalid rows in /metrics only, the default so payloads that scored before keep
+# scoring), "reject" (422 for invalid rows) or "off"
+REQUEST_VALIDATION = os.environ.get("REQUEST_VALIDATION", "warn")
+
+# model loading state reported by /ready
+_model_load = {"error": None}
+
+# Hot reload: poll the served model directory (MODEL_DIR, or the shared directory of
+# scripts/serve_workers.py --shared_dir) every MODEL_WATCH_INTERVAL seconds (0 = off) and reload
+# it with the same backend when its files change; POST /admin/reload does the same on demand. The endpoint is off (404) unless
+# ADMIN_TOKEN is set and needs a matching X-Admin-Token; a model_dir in the request body is only
+# accepted when ADMIN_MODEL_ROOT is set and the resolved path lies under it.
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+ADMIN_MODEL_ROOT = os.environ.get("ADMIN_MODEL_ROOT")
+
+# Prediction audit log (src/serving/audit.py), written when AUDIT_DIR is set
+_audit_sink = None
+
+# Load the model off the event loop so "/" answers while it loads
+def _load_model_in_background():
+    try:
+        inference.load_model()
+    except Exception as e:
+        _model_load["error"] = str(e)
+        log.error("Failed to load model: %s", e)
+
+# Reload when the watched directory's files change. A change is acted on once the files have
+# stopped changing for one interval, so a model still being copied in is not loaded half-written.
+async def _watch_model_dir(model_dir: str, backend: str, interval: float):
+    loop = asyncio.get_running_loop()
+    loaded = inference.model_signature(model_dir)
+    pending = None
+    while True:
+        await asyncio.sleep(interval)
+        current = inference.model_signature(model_dir)
+        if current == loaded:
+            pending = None
+            continue
+        if current != pending:
+            pending = current
+            continue
+        try:
+            await loop.run_in_executor(None, inference.reload_model, model_dir, backend)
+        except Exception as e:
+            log.error("Model reload from %s failed, keeping the current model: %s", model_dir, e)
+        loaded, pending = current, None
+
+# Micro-batcher scoring function: each result is paired with the model that produced it, so
+# /predict reports that model's threshold even when a reload lands between batches
+def _predict_batch_with_model(records: list) -> list:
+    m = inference.get_model()
+    return [(m, result) for result in predict_batch(records, m=m)]
+
+# Startup / shutdown hook
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _batcher, _audit_sink
+    asyncio.get_running_loop().run_in_executor(None, _load_model_in_background)
+    if PREDICT_BATCHING:
+        _batcher = MicroBatcher(_predict_batch_with_model, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+        await _batcher.start()
+    if AUDIT_DIR:
+        _audit_sink = AuditSink(AUDIT_DIR)
+        _audit_sink.start()
+    watcher = None
+    if MODEL_WATCH_INTERVAL > 0:
+        watcher = asyncio.create_task(_watch_model_dir(*inference.model_source(), MODEL_WATCH_INTERVAL))
+    async with _ui_context:
+        yield
+    if watcher is not None:
+        watcher.cancel()
+    if _batcher is not None:
+        await _batcher.stop()
+        _batcher = None
+    if _audit_sink is not None:
+        sink, _audit_sink = _audit_sink, None
+        await run_in_threadpool(sink.close)  # buffered rows are written before exit
 
 # FastAPI application
 app = FastAPI(
     title="Telco Customer Churn Prediction API",
     description="ML API for predicting customer churn in telecom industry",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Health Check Endpoint
+# Health Check Endpoint (liveness only, answers before the model is loaded)
 @app.get("/")
 def root():
     return {"status": "ok"}
 
+# Readiness Endpoint: 200 once the model is loaded, 503 while loading or after a failed load
+@app.get("/ready")
+def ready():
+    if inference.is_ready():
+        m = inference.get_model()
+        return {"status": "ready", "backend": m.backend.name, "model_dir": m.model_dir, "model_id": m.model_id}
+    if _model_load["error"]:
+        return JSONResponse({"status": "failed", "error": _model_load["error"]}, status_code=503)
+    return JSONResponse({"status": "loading"}, status_code=503)
+
+# Admin Reload Request (defaults to the served model directory and backend)
+class ReloadRequest(BaseModel):
+    model_dir: str = None
+    backend: str = None
+
+# Client-supplied model directory, resolved (symlinks, "..") and checked against ADMIN_MODEL_ROOT;
+# None when it is not allowed, since loading a directory unpickles its model files
+def _allowed_model_dir(model_dir: str):
+    if not ADMIN_MODEL_ROOT:
+        return None
+    root = os.path.realpath(ADMIN_MODEL_ROOT)
+    path = os.path.realpath(model_dir)
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+# Admin Reload Endpoint: load + warm up the new model in the background, then swap it in.
+# Returns load, warm-up and swap timings; the current model keeps serving if anything fails.
+@app.post("/admin/reload")
+async def admin_reload(data: ReloadRequest = None, x_admin_token: str = Header(None)):
+    if not ADMIN_TOKEN:
+        return JSONResponse({"error": "Not Found"}, status_code=404)
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        return JSONResponse({"error": "invalid admin token"}, status_code=403)
+    data = data or ReloadRequest()
+    model_dir, backend = inference.model_source()
+    if data.model_dir:
+        model_dir = _allowed_model_dir(data.model_dir)
+        if model_dir is None:
+            return JSONResponse({"error": "model_dir must be under ADMIN_MODEL_ROOT"}, status_code=403)
+    try:
+        report = await run_in_threadpool(
+            inference.reload_model,
+            model_dir,
+            data.backend or backend,
+        )
+    except RuntimeError as e:
+        return JSONResponse({"error": str(e)}, status_code=409)
+    except Exception as e:
+        return JSONResponse({"error": f"Reload failed, current model kept: {e}"}, status_code=500)
+    return {"status": "swapped", **report}
+
 # Data Schemda Request
 class CustomerData(BaseModel):
     # Demographics
@@ -48,115 +210,317 @@ class CustomerData(BaseModel):
     MonthlyCharges: float      # Monthly charges in dollars
     TotalCharges: float        # Total charges to date
 
+# Prediction Cache Statistics (hits, misses, evictions, expirations, invalidations)
+@app.get("/cache")
+def cache_stats():
+    if inference.prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **inference.prediction_cache.stats()}
+
+# Prediction Audit Log Statistics (rows written, dropped and waiting, files, current file)
+@app.get("/audit")
+def audit_stats():
+    if _audit_sink is None:
+        return {"enabled": False}
+    return {"enabled": True, **_audit_sink.stats()}
+
+# Input Drift Report: per-feature PSI (numeric features also get a binned KS) of the rows
+# scored since the model was loaded or the last reset, against the training snapshot
+@app.get("/drift")
+def drift_report(reset: bool = False):
+    if not inference.is_ready():
+        return JSONResponse({"status": "loading"}, status_code=503)
+    monitor = inference.get_model().drift
+    if monitor is None:
+        return {"enabled": False}
+    report = monitor.report()
+    if reset:
+        monitor.reset()
+    return {"enabled": True, **report}
+
+# Per-endpoint request, error and latency metrics
+PREDICT_ENDPOINTS = ("/predict", "/predict/batch", "/predict/columnar", "/explain")
+REQUESTS = {e: Counter("churn_requests_total", "Prediction requests received", {"endpoint": e})
+            for e in PREDICT_ENDPOINTS}
+ERRORS = {e: Counter("churn_request_errors_total", "Prediction requests that returned an error", {"endpoint": e})
+          for e in PREDICT_ENDPOINTS}
+LATENCY = {e: Histogram("churn_request_seconds", "Prediction request handling time", labels={"endpoint": e})
+           for e in PREDICT_ENDPOINTS}
+INVALID_ROWS = Counter("churn_invalid_rows_total", "Request rows that failed domain validation")
+
+# Values owned by other components, read only when /metrics is scraped
+def _collect_serving_state():
+    samples = [("churn_model_ready", "gauge", "1 once the model is loaded", None, int(inference.is_ready()))]
+    cache = inference.prediction_cache
+    if cache is not None:
+        stats = cache.stats()
+        for name in ("hits", "misses", "evictions", "expirations", "invalidations"):
+            samples.append((f"churn_cache_{name}_total", "counter", f"Prediction cache {name}", None, stats[name]))
+        samples.append(("churn_cache_entries", "gauge", "Prediction cache entries", None, stats["size"]))
+    samples.append(("churn_request_logs_dropped_total", "counter", "Request log records dropped by sampling",
+                    None, request_sampler.dropped))
+    if _audit_sink is not None:
+        stats = _audit_sink.stats()
+        samples.append(("churn_audit_rows_total", "counter", "Predictions written to the audit log",
+                        None, stats["rows_written"]))
+        samples.append(("churn_audit_dropped_rows_total", "counter", "Predictions the audit log could not keep",
+                        None, stats["rows_dropped"]))
+        samples.append(("churn_audit_pending_rows", "gauge", "Audit rows waiting for the writer thread",
+                        None, stats["pending_rows"]))
+    drift = inference.get_model().drift if inference.is_ready() else None
+    if drift is not None:
+        report = drift.report()
+        samples.append(("churn_drift_rows", "gauge", "Rows in the current drift window", None, report["rows"]))
+        for feature, stats in report["features"].items():
+            samples.append(("churn_drift_psi", "gauge", "PSI of live inputs vs the training snapshot",
+                            {"feature": feature}, stats["psi"]))
+    reload = inference.last_reload
+    if reload:
+        samples.append(("churn_model_last_swap_seconds", "gauge", "Reference swap time of the last hot reload",
+                        None, reload["swap_ms"] / 1000))
+        samples.append(("churn_model_last_warmup_p50_seconds", "gauge",
+                        "Median warm-up request latency of the last hot reload", None, reload["warmup_p50_ms"] / 1000))
+    return samples
+
+REGISTRY.register_collector(_collect_serving_state)
+
+# Validate parsed records; returns a 422 response when they should be rejected, else None
+def _validate_request(records: list, trace: dict):
+    if REQUEST_VALIDATION == "off":
+        return None
+    t0 = time.perf_counter()
+    errors = telco_validator.validate_records(records)
+    elapsed = time.perf_counter() - t0
+    STAGE_SECONDS["validate"].observe(elapsed)
+    trace["validate_ms"] = elapsed * 1000
+    if not errors:
+        return None
+    INVALID_ROWS.inc(len(errors))
+    if REQUEST_VALIDATION != "reject":
+        return None
+    detail = [{"row": i, "failed_checks": failed} for i, failed in errors]
+    return JSONResponse({"detail": detail}, status_code=422)
+
+# Request log: one JSON line per sampled request (request id, endpoint, rows, model id, stage
+# timings); failed requests are always logged. The sampler runs first, so a dropped request
+# costs one counter increment on the request thread.
+_request_ids = itertools.count(1)
+
+# X-Request-ID when the client sent one, else a process-local id
+def _request_id(x_request_id: str) -> str:
+    return x_request_id or f"{os.getpid()}-{next(_request_ids)}"
+
+def _log_request(endpoint: str, request_id: str, rows: int, trace: dict, t0: float, error: str = None):
+    if error is None and not request_sampler():
+        return
+    fields = {"request_id": request_id, "endpoint": endpoint,
+              "rows": rows, "latency_ms": (time.perf_counter() - t0) * 1000, **trace}
+    if error is None:
+        request_log.info("request", fields)
+    else:
+        request_log.warning(f"request failed: {error}", fields)
+
+# Audit row per scored record: hands references to the inputs and results to the audit sink,
+# which encodes and writes them on its own thread. `m` is the ServingModel that scored the
+# request, so the features, model id and labels all come from the same model.
+def _audit_request(endpoint: str, request_id: str, inputs, results, trace: dict, t0: float, m):
+    sink = _audit_sink
+    if sink is None:
+        return
+    sink.record(endpoint, request_id, m.model_id, m, inputs, results,
+                (time.perf_counter() - t0) * 1000)
+
+# Metrics Endpoint (Prometheus text format)
+@app.get("/metrics")
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
 # Prediction Endpoint
 @app.post("/predict")
-def get_prediction(data: CustomerData):
+async def get_prediction(data: CustomerData, x_request_id: str = Header(None)):
+    t0 = time.perf_counter()
+    REQUESTS["/predict"].inc()
+    request_id = _request_id(x_request_id)
+    trace, error = {}, None
     try:
-        # Convert Pydantic model to dict and call inference pipeline
-        result = predict(data.dict())
-        return {"prediction": result}
+        # Convert Pydantic model to dict and call inference pipeline,
+        # through the micro-batcher when enabled, else on the threadpool
+        record = data.dict()
+        trace["parse_ms"] = (time.perf_counter() - t0) * 1000
+        STAGE_SECONDS["parse"].observe(trace["parse_ms"] / 1000)
+        rejected = _validate_request([record], trace)
+        if rejected is not None:
+            ERRORS["/predict"].inc()
+            error = "invalid request"
+            return rejected
+        if _batcher is not None:
+            m, result = await _batcher.submit(record)  # stage timings are per micro-batch, not logged
+        else:
+            m = inference.get_model()
+            result = (await run_in_threadpool(predict_batch, [record], trace, m))[0]
+        _audit_request("/predict", request_id, [record], [result], trace, t0, m)
+        return {**result, "threshold": m.threshold}
     except Exception as e:
-        return {"error": str(e)}
-
-
-# Gradio UI
-
-def gradio_interface(
-    gender, Partner, Dependents, PhoneService, MultipleLines,
-    InternetService, OnlineSecurity, OnlineBackup, DeviceProtection,
-    TechSupport, StreamingTV, StreamingMovies, Contract,
-    PaperlessBilling, PaymentMethod, tenure, MonthlyCharges, TotalCharges
-):
-
-    # Construct data dictionary matching CustomerData schema
-    data = {
-        "gender": gender,
-        "Partner": Partner,
-        "Dependents": Dependents,
-        "PhoneService": PhoneService,
-        "MultipleLines": MultipleLines,
-        "InternetService": InternetService,
-        "OnlineSecurity": OnlineSecurity,
-        "OnlineBackup": OnlineBackup,
-        "DeviceProtection": DeviceProtection,
-        "TechSupport": TechSupport,
-        "StreamingTV": StreamingTV,
-        "StreamingMovies": StreamingMovies,
-        "Contract": Contract,
-        "PaperlessBilling": PaperlessBilling,
-        "PaymentMethod": PaymentMethod,
-        "tenure": int(tenure),              # Ensure integer type
-        "MonthlyCharges": float(MonthlyCharges),  # Ensure float type
-        "TotalCharges": float(TotalCharges),      # Ensure float type
-    }
-    
-    # Call same inference pipeline as API endpoint
-    result = predict(data)
-    return str(result)  # Return as string for Gradio display
-
-# Gradio Config
-demo = gr.Interface(
-    fn=gradio_interface,
-    inputs=[
-        # Demographics section
-        gr.Dropdown(["Male", "Female"], label="Gender", value="Male"),
-        gr.Dropdown(["Yes", "No"], label="Partner", value="No"),
-        gr.Dropdown(["Yes", "No"], label="Dependents", value="No"),
-        
-        # Phone services section
-        gr.Dropdown(["Yes", "No"], label="Phone Service", value="Yes"),
-        gr.Dropdown(["Yes", "No", "No phone service"], label="Multiple Lines", value="No"),
-        
-        # Internet services section (key churn predictors)
-        gr.Dropdown(["DSL", "Fiber optic", "No"], label="Internet Service", value="Fiber optic"),
-        gr.Dropdown(["Yes", "No", "No internet service"], label="Online Security", value="No"),
-        gr.Dropdown(["Yes", "No", "No internet service"], label="Online Backup", value="No"),
-        gr.Dropdown(["Yes", "No", "No internet service"], label="Device Protection", value="No"),
-        gr.Dropdown(["Yes", "No", "No internet service"], label="Tech Support", value="No"),
-        gr.Dropdown(["Yes", "No", "No internet service"], label="Streaming TV", value="Yes"),
-        gr.Dropdown(["Yes", "No", "No internet service"], label="Streaming Movies", value="Yes"),
-        
-        # Contract and billing section (major churn factors)
-        gr.Dropdown(["Month-to-month", "One year", "Two year"], label="Contract", value="Month-to-month"),
-        gr.Dropdown(["Yes", "No"], label="Paperless Billing", value="Yes"),
-        gr.Dropdown([
-            "Electronic check", "Mailed check",
-            "Bank transfer (automatic)", "Credit card (automatic)"
-        ], label="Payment Method", value="Electronic check"),
-        
-        # Numeric features (important for churn prediction)
-        gr.Number(label="Tenure (months)", value=1, minimum=0, maximum=100),
-        gr.Number(label="Monthly Charges ($)", value=85.0, minimum=0, maximum=200),
-        gr.Number(label="Total Charges ($)", value=85.0, minimum=0, maximum=10000),
-    ],
-    outputs=gr.Textbox(label="Churn Prediction", lines=2),
-    title="🔮 Telco Customer Churn Predictor",
-    description="""
-    **Predict customer churn probability using machine learning**
-    
-    Fill in the customer details below to get a churn prediction. The model uses XGBoost trained on 
-    historical telecom customer data to identify customers at risk of churning.
-    
-    💡 **Tip**: Month-to-month contracts with fiber optic internet and electronic check payments 
-    tend to have higher churn rates.
-    """,
-    examples=[
-        # High churn risk example
-        ["Female", "No", "No", "Yes", "No", "Fiber optic", "No", "No", "No", 
-         "No", "Yes", "Yes", "Month-to-month", "Yes", "Electronic check", 
-         1, 85.0, 85.0],
-        # Low churn risk example  
-        ["Male", "Yes", "Yes", "Yes", "Yes", "DSL", "Yes", "Yes", "Yes",
-         "Yes", "No", "No", "Two year", "No", "Credit card (automatic)",
-         60, 45.0, 2700.0]
-    ],
-    theme=gr.themes.Soft()  # Professional appearance
-)
+        ERRORS["/predict"].inc()
+        error = str(e)
+        return {"error": error}
+    finally:
+        LATENCY["/predict"].observe(time.perf_counter() - t0)
+        _log_request("/predict", request_id, 1, trace, t0, error)
+
+# Batch Prediction Endpoint
+# Accepts a JSON list of customers, predictions are returned in the same order
+@app.post("/predict/batch")
+def get_batch_prediction(data: List[CustomerData], x_request_id: str = Header(None)):
+    t0 = time.perf_counter()
+    REQUESTS["/predict/batch"].inc()
+    request_id = _request_id(x_request_id)
+    trace, error = {}, None
+    try:
+        # One vectorized transform + one model call for the whole batch
+        records = [d.dict() for d in data]
+        trace["parse_ms"] = (time.perf_counter() - t0) * 1000
+        STAGE_SECONDS["parse"].observe(trace["parse_ms"] / 1000)
+        rejected = _validate_request(records, trace)
+        if rejected is not None:
+            ERRORS["/predict/batch"].inc()
+            error = "invalid request"
+            return rejected
+        m = inference.get_model()
+        results = predict_batch(records, trace, m)
+        _audit_request("/predict/batch", request_id, records, results, trace, t0, m)
+        return {"predictions": results, "threshold": m.threshold}
+    except Exception as e:
+        ERRORS["/predict/batch"].inc()
+        error = str(e)
+        return {"error": error}
+    finally:
+        LATENCY["/predict/batch"].observe(time.perf_counter() - t0)
+        _log_request("/predict/batch", request_id, len(data), trace, t0, error)
+
+# Columnar Bulk Prediction Endpoint
+# Body is an Arrow IPC stream (application/vnd.apache.arrow.stream) or a MessagePack column map
+# (application/x-msgpack) with the CustomerData fields as columns; the response uses the same
+# format. Columns go straight to the vectorized encoder, no per-row Pydantic objects.
+@app.post("/predict/columnar")
+async def get_columnar_prediction(request: Request, x_request_id: str = Header(None)):
+    t0 = time.perf_counter()
+    REQUESTS["/predict/columnar"].inc()
+    request_id = _request_id(x_request_id)
+    trace, error, rows = {}, None, 0
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    try:
+        if content_type == columnar.ARROW_STREAM:
+            decode, encode = columnar.decode_arrow, columnar.encode_arrow
+        elif content_type in columnar.MSGPACK_TYPES:
+            decode, encode = columnar.decode_msgpack, columnar.encode_msgpack
+        else:
+            error = f"unsupported content type '{content_type}'"
+            return JSONResponse({"error": error, "supported": [columnar.ARROW_STREAM, columnar.MSGPACK]},
+                                status_code=415)
+        body = await request.body()
+        df = decode(body)
+        rows = len(df)
+        trace["parse_ms"] = (time.perf_counter() - t0) * 1000
+        STAGE_SECONDS["parse"].observe(trace["parse_ms"] / 1000)
+
+        # same domain checks as the JSON endpoints, on whole columns
+        if REQUEST_VALIDATION != "off":
+            t1 = time.perf_counter()
+            report = request_validator.validate(df)
+            STAGE_SECONDS["validate"].observe(time.perf_counter() - t1)
+            if not report["valid"]:
+                INVALID_ROWS.inc(report["invalid_rows"])
+                if REQUEST_VALIDATION == "reject":
+                    ERRORS["/predict/columnar"].inc()
+                    error = "invalid request"
+                    return JSONResponse({"detail": report["failed_rows"], "failures": report["failures"]},
+                                        status_code=422)
+
+        m, proba = await run_in_threadpool(inference.predict_columns, df, trace)
+        _audit_request("/predict/columnar", request_id, df, proba, trace, t0, m)
+        return Response(encode(proba, m.threshold, m.model_id), media_type=content_type)
+    except ImportError as e:
+        error = f"{content_type} needs an optional package: {e}"
+        return JSONResponse({"error": error}, status_code=415)
+    except Exception as e:
+        ERRORS["/predict/columnar"].inc()
+        error = str(e)
+        return JSONResponse({"error": error}, status_code=400)
+    finally:
+        LATENCY["/predict/columnar"].observe(time.perf_counter() - t0)
+        _log_request("/predict/columnar", request_id, rows, trace, t0, error)
+
+# Explanation Endpoint
+# Accepts a JSON list of customers; for each one returns the prediction plus the top_k raw fields
+# (e.g. "Contract", not "Contract_Two year") by absolute TreeSHAP contribution, in log-odds
+@app.post("/explain")
+def get_explanations(data: List[CustomerData], top_k: int = DEFAULT_TOP_K, x_request_id: str = Header(None)):
+    t0 = time.perf_counter()
+    REQUESTS["/explain"].inc()
+    request_id = _request_id(x_request_id)
+    trace, error = {}, None
+    try:
+        records = [d.dict() for d in data]
+        trace["parse_ms"] = (time.perf_counter() - t0) * 1000
+        STAGE_SECONDS["parse"].observe(trace["parse_ms"] / 1000)
+        rejected = _validate_request(records, trace)
+        if rejected is not None:
+            ERRORS["/explain"].inc()
+            error = "invalid request"
+            return rejected
+        m = inference.get_model()
+        results = explain_batch(records, max(1, top_k), trace, m)
+        _audit_request("/explain", request_id, records, results, trace, t0, m)
+        return {"explanations": results, "threshold": m.threshold}
+    except Exception as e:
+        ERRORS["/explain"].inc()
+        error = str(e)
+        return {"error": error}
+    finally:
+        LATENCY["/explain"].observe(time.perf_counter() - t0)
+        _log_request("/explain", request_id, len(data), trace, t0, error)
+
+
+# Gradio UI Mounting
+# Gradio's own startup/shutdown runs inside the app lifespan via this exit stack
+_ui_context = AsyncExitStack()
+_ui_lock = asyncio.Lock()
+_ui_mounted = False
+
+# Import gradio, build the interface and mount it at /ui
+def _mount_ui():
+    global _ui_mounted
+    import gradio as gr
+    from src.app.ui import build_ui
+
+    gr.mount_gradio_app(app, build_ui(), path=UI_PATH)
+    _ui_mounted = True
+
+# Lazy mounting after startup: gradio's startup events have to be run by hand
+async def _mount_ui_lazily():
+    async with _ui_lock:
+        if _ui_mounted:
+            return
+        _mount_ui()
+        gradio_app = app.router.routes[-1].app  # the Mount just added by mount_gradio_app
+        await _ui_context.enter_async_context(gradio_app.router.lifespan_context(gradio_app))
+        gradio_app.get_blocks().run_startup_events()
+        await gradio_app.get_blocks().run_extra_startup_events()
+
+# ASGI middleware that mounts the UI on the first request under /ui
+class LazyUIMiddleware:
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (not _ui_mounted and scope["type"] in ("http", "websocket")
+                and scope["path"].startswith(UI_PATH)):
+            await _mount_ui_lazily()
+        await self.app(scope, receive, send)
 
-# Mount Gradio to API
-# Create the /ui endpoint that serves the Gradio interface
-app = gr.mount_gradio_app(
-    app,           # FastAPI
-    demo,          # Gradio
-    path="/ui"     # URL path where Gradio will be accessible
-)
\ No newline at end of file
+if UI_MODE == "eager":
+    _mount_ui()
+elif UI_MODE == "lazy":
+    app.add_middleware(LazyUIMiddleware)
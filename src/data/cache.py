@@ -0,0 +1,92 @@
+### cache.py
+
+# Imports
+import os
+import json
+import hashlib
+import joblib
+import pandas as pd
+import pyarrow.feather as feather
+
+# source files whose changes invalidate cached data-prep outputs
+_SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CODE_FILES = [
+    os.path.join(_SRC_DIR, "data", "load_data.py"),
+    os.path.join(_SRC_DIR, "data", "preprocess.py"),
+    os.path.join(_SRC_DIR, "features", "build_features.py"),
+    os.path.join(_SRC_DIR, "utils", "validate_data.py"),
+]
+
+# sha256 of a file, read in 1 MB blocks
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# Hash of the data-prep code plus the pandas version (cached frames are pandas/Arrow files)
+def code_version(files: list = CODE_FILES) -> str:
+    h = hashlib.sha256(pd.__version__.encode())
+    for path in files:
+        h.update(file_sha256(path).encode())
+    return h.hexdigest()
+
+# sha256 of a file, or of the visible files of a directory (name + content, sorted by name)
+def path_sha256(path: str) -> str:
+    if not os.path.isdir(path):
+        return file_sha256(path)
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        if not name.startswith((".", "_")):
+            h.update(name.encode())
+            h.update(file_sha256(os.path.join(path, name)).encode())
+    return h.hexdigest()
+
+# Cache key: raw file content + data-prep code + stage config (e.g. target column)
+def cache_key(raw_path: str, config: dict = None) -> str:
+    h = hashlib.sha256()
+    h.update(path_sha256(raw_path).encode())
+    h.update(code_version().encode())
+    h.update(json.dumps(config or {}, sort_keys=True).encode())
+    return h.hexdigest()[:16]
+
+
+# Feature-store style cache of data-prep outputs: one directory per key holding
+# Feather frames (memory-mapped on load) and pickled objects such as the fitted encoder
+class DatasetCache:
+
+    def __init__(self, cache_dir: str, key: str):
+        self.key = key
+        self.dir = os.path.join(cache_dir, key)
+
+    def _frame_path(self, name: str) -> str:
+        return os.path.join(self.dir, f"{name}.feather")
+
+    def _object_path(self, name: str) -> str:
+        return os.path.join(self.dir, f"{name}.pkl")
+
+    # True when every named frame/object was saved under this key
+    def has(self, frames: list = (), objects: list = ()) -> bool:
+        return (all(os.path.exists(self._frame_path(n)) for n in frames)
+                and all(os.path.exists(self._object_path(n)) for n in objects))
+
+    def save_frame(self, name: str, df: pd.DataFrame):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self._frame_path(name) + ".tmp"
+        # uncompressed so the file can be memory-mapped instead of decoded on load
+        feather.write_feather(df.reset_index(drop=True), tmp, compression="uncompressed")
+        os.replace(tmp, self._frame_path(name))  # readers never see a half-written file
+
+    def load_frame(self, name: str) -> pd.DataFrame:
+        table = feather.read_table(self._frame_path(name), memory_map=True)
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def save_object(self, name: str, obj):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = self._object_path(name) + ".tmp"
+        joblib.dump(obj, tmp)
+        os.replace(tmp, self._object_path(name))
+
+    def load_object(self, name: str):
+        return joblib.load(self._object_path(name))
@@ -4,8 +4,80 @@
 import pandas as pd
 import os
 
-#Load data into a pandas dataframe
-def load_data(file_path):
+# Explicit dtype schema for the raw Telco extract (typed=True): service columns as categoricals,
+# charges as float32, small nullable ints. Ids stay plain strings.
+RAW_DTYPES = {
+    "customerID": "object",
+    "gender": "category",
+    "SeniorCitizen": "Int8",
+    "Partner": "category",
+    "Dependents": "category",
+    "tenure": "Int16",
+    "PhoneService": "category",
+    "MultipleLines": "category",
+    "InternetService": "category",
+    "OnlineSecurity": "category",
+    "OnlineBackup": "category",
+    "DeviceProtection": "category",
+    "TechSupport": "category",
+    "StreamingTV": "category",
+    "StreamingMovies": "category",
+    "Contract": "category",
+    "PaperlessBilling": "category",
+    "PaymentMethod": "category",
+    "MonthlyCharges": "float32",
+    "TotalCharges": "float32",
+    "Churn": "category",
+}
+
+# blank TotalCharges (new customers) are read as missing instead of failing the float parse
+NA_VALUES = {"TotalCharges": [" ", ""]}
+
+# Cast a frame read without a schema (e.g. Parquet written elsewhere) to RAW_DTYPES
+def _apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    for col, dtype in RAW_DTYPES.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith(("float", "Int")) and not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df[col] = df[col].astype(dtype)
+    return df
+
+# Stream a Parquet file (or a directory of them) as DataFrame chunks (one Arrow record batch at a time)
+def _iter_parquet(file_path, columns, typed, chunksize):
+    import pyarrow.dataset as ds
+    for batch in ds.dataset(file_path, format="parquet").to_batches(columns=columns, batch_size=chunksize):
+        df = batch.to_pandas()
+        yield _apply_schema(df) if typed else df
+
+# Load data into a pandas dataframe
+# columns:   only read these columns (usecols pruning)
+# typed:     apply RAW_DTYPES (categoricals + float32), several times smaller than inferred object columns
+# chunksize: return an iterator of DataFrames with at most chunksize rows each
+# engine:    CSV parser, "c" (default) or "pyarrow" (multi-threaded, whole-file reads only)
+def load_data(file_path, columns=None, typed=False, chunksize=None, engine="c"):
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    return pd.read_csv(file_path)
\ No newline at end of file
+
+    # a directory is read as one Parquet dataset (e.g. rotated prediction audit files)
+    if file_path.endswith(".parquet") or os.path.isdir(file_path):
+        if chunksize:
+            return _iter_parquet(file_path, columns, typed, chunksize)
+        df = pd.read_parquet(file_path, columns=columns)
+        return _apply_schema(df) if typed else df
+
+    if not typed:
+        return pd.read_csv(file_path, usecols=columns, chunksize=chunksize, engine=engine)
+
+    if chunksize and engine == "pyarrow":
+        raise ValueError("The pyarrow CSV engine does not support chunksize, use engine='c'")
+
+    # restrict the schema to the columns that are actually read
+    wanted = None if columns is None else set(columns)
+    dtypes = {c: t for c, t in RAW_DTYPES.items() if wanted is None or c in wanted}
+    na_values = {c: v for c, v in NA_VALUES.items() if c in dtypes}
+    if engine == "pyarrow":
+        # the pyarrow parser only takes one list of NA markers for all columns
+        na_values = sorted({v for values in na_values.values() for v in values})
+    return pd.read_csv(file_path, usecols=columns, dtype=dtypes, na_values=na_values,
+                       chunksize=chunksize, engine=engine)
@@ -7,8 +7,9 @@ import pandas as pd
 def preprocess_data(df, target_col: str = "Churn"):
 
     df.columns = df.columns.str.strip()  # Remove leading/trailing whitespace for headers
-    df = df.drop(columns="customerID") # drop ids
-    df[target_col] = df[target_col].str.strip().map({"No": 0, "Yes": 1}) #target_col = 0 or 1
+    df = df.drop(columns="customerID", errors="ignore") # drop ids
+    if target_col in df.columns: # unlabeled scoring files have no target
+        df[target_col] = df[target_col].str.strip().map({"No": 0, "Yes": 1}) #target_col = 0 or 1
     df["TotalCharges"] = pd.to_numeric(df["TotalCharges"], errors="coerce") #convert to float
     df["SeniorCitizen"] = df["SeniorCitizen"].fillna(0).astype(int) #convert to 0 or 1
 
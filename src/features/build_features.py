@@ -1,70 +1,172 @@
 ### build_features.py
 
 # Imports
+import numpy as np
 import pandas as pd
+from src.serving.utils import get_logger
 
-# handles binary encoding for 2-category features
-def _map_binary_series(s):
+log = get_logger("features")
+
+# handles binary encoding for 2-category features: value -> 0/1
+def _binary_mapping(values: list) -> dict:
+
+    valset = set(values)
 
-    # Get unique values and remove NaN
-    vals = list(pd.Series(s.dropna().unique()).astype(str))
-    valset = set(vals)
-    
     # Yes/No mapping
     if valset == {"Yes", "No"}:
-        return s.map({"No": 0, "Yes": 1}).astype("Int64")
-        
+        return {"No": 0, "Yes": 1}
+
     # Gender mapping
     if valset == {"Male", "Female"}:
-        return s.map({"Female": 0, "Male": 1}).astype("Int64")
+        return {"Female": 0, "Male": 1}
 
     # Generic mapping for other 2 category features by alphabetic order
-    if len(vals) == 2:
-        sorted_vals = sorted(vals)
-        mapping = {sorted_vals[0]: 0, sorted_vals[1]: 1}
-        return s.astype(str).map(mapping).astype("Int64")
+    sorted_vals = sorted(values)
+    return {sorted_vals[0]: 0, sorted_vals[1]: 1}
+
+# Integer codes of a column against a {value: code} lookup, unknown/missing values get `missing`.
+# Only the distinct values are cleaned and looked up, rows are resolved with one np.take.
+def _lookup_codes(s: pd.Series, index: dict, missing: int = -1) -> np.ndarray:
+    codes, uniques = pd.factorize(s)
+    lut = np.fromiter((index.get(str(u).strip(), missing) for u in uniques), dtype=np.int64, count=len(uniques))
+    lut = np.append(lut, missing)  # factorize marks NaN with -1, i.e. the last slot
+    return lut[codes]
+
+
+# Fit/transform feature encoder: learns the binary and one-hot categories once during training
+# and is pickled into preprocessing.pkl so serving encodes with exactly the same layout
+class FeatureEncoder:
+
+    def __init__(self, target_col: str = None):
+        self.target_col = target_col
+        self.columns = []         # output layout of transform_frame (target included)
+        self.feature_cols = []    # model input order (target excluded)
+        self.numeric_cols = []    # passed through as numbers
+        self.binary = {}          # column -> {value: 0/1}
+        self.onehot = {}          # column -> kept categories (sorted, first dropped)
+
+    # Learn column roles and categories from a preprocessed training frame
+    def fit(self, df: pd.DataFrame) -> "FeatureEncoder":
+
+        log.info("Starting feature engineering on %d columns...", df.shape[1])
+
+        # Find categorical columns (object/category dtype) excluding the target variable
+        cat_cols = [c for c in df.select_dtypes(include=["object", "category"]).columns if c != self.target_col]
+
+        # distinct non-missing values, computed once per column
+        # Binary features (exactly 2 unique values) get binary encoding
+        # Multi-category features (>2 unique values) get one-hot encoding (drop_first)
+        for c in cat_cols:
+            values = sorted({str(v).strip() for v in pd.factorize(df[c])[1]})  # NaN excluded
+            if len(values) == 2:
+                self.binary[c] = _binary_mapping(values)
+            elif len(values) > 2:
+                self.onehot[c] = values[1:]
+
+        # Everything else keeps its position, dummy columns are appended (same layout as get_dummies)
+        self.columns = [c for c in df.columns if c not in self.onehot]
+        self.columns += [f"{c}_{v}" for c, values in self.onehot.items() for v in values]
+        self.feature_cols = [c for c in self.columns if c != self.target_col]
+        self.numeric_cols = [c for c in df.columns
+                             if c != self.target_col and c not in self.binary and c not in self.onehot]
+
+        if self.onehot:
+            new_features = sum(len(v) for v in self.onehot.values())
+            log.info("Created %d new features from %d categorical columns", new_features, len(self.onehot))
+        log.info("Feature engineering complete: %d final features", len(self.columns))
+        return self
+
+    # Rebuild an encoder from a saved feature list ("<column>_<value>" names are one-hot columns),
+    # for model directories that only ship feature_columns.txt
+    @classmethod
+    def from_feature_columns(cls, feature_cols: list, binary_map: dict) -> "FeatureEncoder":
+        enc = cls()
+        enc.columns = list(feature_cols)
+        enc.feature_cols = list(feature_cols)
+        for name in feature_cols:
+            if name in binary_map:
+                enc.binary[name] = dict(binary_map[name])
+            elif "_" in name:
+                col, value = name.split("_", 1)  # raw column names have no "_"
+                enc.onehot.setdefault(col, []).append(value)
+            else:
+                enc.numeric_cols.append(name)
+        return enc
+
+    # Output index lookups, built once and reused by every transform
+    def _plan(self):
+        plan = self.__dict__.get("_plan_cache")
+        if plan is None:
+            pos = {name: i for i, name in enumerate(self.feature_cols)}
+            plan = (
+                [(c, pos[c]) for c in self.numeric_cols],
+                [(c, pos[c], mapping) for c, mapping in self.binary.items()],
+                [(c, {v: pos[f"{c}_{v}"] for v in values}) for c, values in self.onehot.items()],
+            )
+            self._plan_cache = plan
+        return plan
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_plan_cache", None)
+        return state
+
+    # Encode a frame into a contiguous (n_rows, n_features) matrix in one pass over each column.
+    # Missing columns and unseen categories encode as 0 (same as the record encoder).
+    def transform(self, df, dtype=np.float32) -> np.ndarray:
+        return self._encode(df, dtype, numeric=True)
+
+    def _encode(self, df, dtype, numeric: bool) -> np.ndarray:
+
+        if not isinstance(df, pd.DataFrame):
+            df = pd.DataFrame(df)
+
+        # match columns on stripped names without touching the caller's frame
+        columns = {str(c).strip(): c for c in df.columns}
+        numeric_plan, binary_plan, onehot_plan = self._plan()
+
+        # filled column by column in Fortran order, returned row-major (C-contiguous)
+        X = np.zeros((len(df), len(self.feature_cols)), dtype=dtype, order="F")
+
+        if numeric:
+            for col, i in numeric_plan:
+                if col in columns:
+                    X[:, i] = pd.to_numeric(df[columns[col]], errors="coerce").fillna(0).to_numpy(dtype=dtype)
+
+        for col, i, mapping in binary_plan:
+            if col in columns:
+                X[:, i] = _lookup_codes(df[columns[col]], mapping, missing=0)
+
+        # one scatter per one-hot column: row r gets a 1 at the output index of its category
+        for col, index in onehot_plan:
+            if col in columns:
+                out = _lookup_codes(df[columns[col]], index)
+                rows = np.flatnonzero(out >= 0)
+                X[rows, out[rows]] = 1
+
+        return np.ascontiguousarray(X)
+
+    # Encode a frame into the training DataFrame layout: passthrough columns (target included)
+    # keep their values, binary columns become 0/1 ints and dummy columns are bools
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+
+        codes = self._encode(df, np.uint8, numeric=False)
+        pos = {name: i for i, name in enumerate(self.feature_cols)}
+        dummies = {f"{c}_{v}" for c, values in self.onehot.items() for v in values}
+
+        out = {}
+        for c in self.columns:
+            if c in self.binary:
+                out[c] = codes[:, pos[c]].astype(int)
+            elif c in dummies:
+                out[c] = codes[:, pos[c]].astype(bool)
+            elif pd.api.types.is_bool_dtype(df[c]):
+                out[c] = df[c].astype(int)  # Convert Boolean Columns
+            else:
+                out[c] = df[c]
+        return pd.DataFrame(out, index=df.index)
 
-    return s
 
 # build_features function transform raw data into ML-ready features
 def build_features(df, target_col):
-
-    df = df.copy()
-    print(f"Starting feature engineering on {df.shape[1]} columns...")
-
-    # Find categorical columns (object dtype) excluding the target variable
-    obj_cols = [c for c in df.select_dtypes(include=["object"]).columns if c != target_col]
-    numeric_cols = df.select_dtypes(include=["int64", "float64"]).columns.tolist()
- 
-    # Binary features (exactly 2 unique values) get binary encoding
-    # Multi-category features (>2 unique values) get one-hot encoding
-    binary_cols = [c for c in obj_cols if df[c].dropna().nunique() == 2]
-    multi_cols = [c for c in obj_cols if df[c].dropna().nunique() > 2] 
-
-    # Convert 2-category features to 0/1
-    for c in binary_cols:
-        original_dtype = df[c].dtype
-        df[c] = _map_binary_series(df[c].astype(str))
-
-    # Convert Boolean Columns
-    bool_cols = df.select_dtypes(include=["bool"]).columns.tolist()
-    if bool_cols:
-        df[bool_cols] = df[bool_cols].astype(int)
-
-    # One-Hot Encoding for Multi-Category Features
-   
-    if multi_cols:
-        original_shape = df.shape
-        
-        # Apply one-hot encoding with drop_first=True
-        df = pd.get_dummies(df, columns=multi_cols, drop_first=True)
-        new_features = df.shape[1] - original_shape[1] + len(multi_cols) #dtypes = int??
-        print(f"      Created {new_features} new features from {len(multi_cols)} categorical columns")
-
-    # Convert nullable integers (Int64) to standard integers for XGBoost
-    for c in binary_cols:
-        if pd.api.types.is_integer_dtype(df[c]):
-            df[c] = df[c].fillna(0).astype(int) # Fill NaN values with int 0
-
-    print(f"Feature engineering complete: {df.shape[1]} final features")
-    return df
\ No newline at end of file
+    return FeatureEncoder(target_col).fit(df).transform_frame(df)
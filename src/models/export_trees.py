@@ -0,0 +1,87 @@
+### export_trees.py
+
+# Imports
+import os
+import json
+import math
+import pickle
+import argparse
+import numpy as np
+
+# Output file written next to feature_columns.txt and read by src/serving/tree_model.py
+TREE_MODEL_FILE = "tree_model.npz"
+
+# Flatten a binary:logistic XGBoost booster into arrays that can be evaluated without xgboost.
+# All trees are concatenated into one node table; "roots" holds the index of each tree's root.
+# Leaves point to themselves so every tree can be walked for exactly max_depth steps.
+def flatten_booster(booster) -> dict:
+
+    model = json.loads(booster.save_raw(raw_format="json"))
+    learner = model["learner"]
+
+    objective = learner["objective"]["name"]
+    if objective != "binary:logistic":
+        raise ValueError(f"Only binary:logistic models can be exported, got {objective}")
+
+    # base_score is stored in probability space, e.g. "[5E-1]". xgboost turns it into a margin in
+    # float32 as -logf(1 / base_score - 1); logf is correctly rounded, so the log is taken in
+    # float64 and rounded once (NumPy's float32 log can be an ulp off)
+    base_score = np.float32(learner["learner_model_param"]["base_score"].strip("[]"))
+    odds = np.float32(1.0) / base_score - np.float32(1.0)
+    base_margin = np.float32(-math.log(float(odds)))
+
+    feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+    max_depth = 0
+
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        offset = len(feature)
+        roots.append(offset)
+        lefts, rights = tree["left_children"], tree["right_children"]
+
+        depth = [0] * len(lefts)
+        for n, (l, r) in enumerate(zip(lefts, rights)):
+            is_leaf = l == -1
+            feature.append(0 if is_leaf else tree["split_indices"][n])
+            threshold.append(tree["split_conditions"][n])
+            left.append(offset + (n if is_leaf else l))
+            right.append(offset + (n if is_leaf else r))
+            default_left.append(bool(tree["default_left"][n]))
+            # leaf values live in split_conditions for leaf nodes
+            value.append(tree["split_conditions"][n] if is_leaf else 0.0)
+            if not is_leaf:
+                depth[l] = depth[r] = depth[n] + 1
+                max_depth = max(max_depth, depth[n] + 1)
+
+    return {
+        "feature": np.asarray(feature, dtype=np.int32),
+        "threshold": np.asarray(threshold, dtype=np.float32),
+        "left": np.asarray(left, dtype=np.int32),
+        "right": np.asarray(right, dtype=np.int32),
+        "default_left": np.asarray(default_left, dtype=bool),
+        "value": np.asarray(value, dtype=np.float32),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "base_margin": np.float64(base_margin),
+        "max_depth": np.int32(max_depth),
+        "n_features": np.int32(int(learner["learner_model_param"]["num_feature"])),
+    }
+
+# Write the flattened ensemble to disk
+def export_tree_ensemble(booster, path: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez(path, **flatten_booster(booster))
+    return path
+
+
+# Export from an existing MLflow model directory (model.pkl holds the sklearn XGBClassifier)
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Export an XGBoost churn model as flat tree arrays")
+    p.add_argument("--model_dir", type=str, required=True,
+                   help="MLflow model directory containing model.pkl")
+    p.add_argument("--out", type=str, required=True,
+                   help=f"output path, e.g. artifacts/{TREE_MODEL_FILE}")
+    args = p.parse_args()
+
+    with open(os.path.join(args.model_dir, "model.pkl"), "rb") as f:
+        clf = pickle.load(f)
+    export_tree_ensemble(clf.get_booster(), args.out)
+    print(f"Exported {clf.get_booster().num_boosted_rounds()} trees to {args.out}")
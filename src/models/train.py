@@ -4,6 +4,7 @@
 import mlflow
 import pandas as pd
 import mlflow.xgboost
+import xgboost as xgb
 from xgboost import XGBClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
@@ -49,4 +50,56 @@ def train_model(df, target_col):
         train_ds = mlflow.data.from_pandas(df, source="training_data")
         mlflow.log_input(train_ds, context="training")
 
-        print(f"Model trained. Accuracy: {acc:.4f}, Recall: {rec:.4f}")
\ No newline at end of file
+        print(f"Model trained. Accuracy: {acc:.4f}, Recall: {rec:.4f}")
+
+
+# Peak resident memory of this process in MB (ru_maxrss on Unix, peak working set on Windows)
+def peak_rss_mb() -> float:
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2**20
+
+# Train with the native API: features are binned once into a QuantileDMatrix (hist tree method),
+# a stratified slice of the train split is held out for early stopping, and the booster is cut
+# back to its best iteration before being wrapped as an XGBClassifier for the sklearn flavor.
+# Returns (model, evals_result) where evals_result holds the per-round train/eval curves.
+# With xgb_model (a Booster or XGBClassifier) boosting continues from that model's trees instead of
+# starting over, so only the new rows are binned and num_boost_round counts the added rounds.
+def train_booster(X_train, y_train, params: dict, num_boost_round: int, eval_size: float = 0.1,
+                  early_stopping_rounds: int = 30, seed: int = 42, xgb_model=None):
+
+    X_fit, X_eval, y_fit, y_eval = train_test_split(
+        X_train, y_train, test_size=eval_size, stratify=y_train, random_state=seed
+    )
+    dtrain = xgb.QuantileDMatrix(X_fit, y_fit)
+    deval = xgb.QuantileDMatrix(X_eval, y_eval, ref=dtrain)  # reuses the training bins
+
+    if isinstance(xgb_model, XGBClassifier):
+        xgb_model = xgb_model.get_booster()
+    base_rounds = xgb_model.num_boosted_rounds() if xgb_model is not None else 0
+
+    booster_params = {"objective": "binary:logistic", "tree_method": "hist", "seed": seed, **params}
+    evals_result = {}
+    booster = xgb.train(
+        booster_params, dtrain, num_boost_round=num_boost_round,
+        evals=[(dtrain, "train"), (deval, "eval")], evals_result=evals_result,
+        early_stopping_rounds=early_stopping_rounds, verbose_eval=False, xgb_model=xgb_model,
+    )
+
+    # keep only the trees up to the best iteration (what gets served)
+    best_rounds = booster.best_iteration + 1
+    booster = booster[:best_rounds]
+
+    # sklearn wrapper around the trained booster, so mlflow.sklearn and predict_proba keep working
+    metric = booster_params.get("eval_metric", "logloss")
+    sk_params = {k: v for k, v in params.items() if k not in ("nthread", "seed", "tree_method")}
+    model = XGBClassifier(**sk_params, n_estimators=best_rounds, tree_method="hist", random_state=seed)
+    model.load_model(bytearray(booster.save_raw("ubj")))
+
+    # the best iteration travels with the saved model
+    model.get_booster().set_attr(best_iteration=str(best_rounds - 1),
+                                 best_score=str(evals_result["eval"][metric][best_rounds - base_rounds - 1]))
+    return model, evals_result
@@ -1,33 +1,125 @@
 ### tune.py
 
 # Imports
+import os
+import numpy as np
 import optuna
-from xgboost import XGBClassifier
-from sklearn.model_selection import cross_val_score
+import xgboost as xgb
+from sklearn.model_selection import StratifiedKFold
 
-# tune function
-def tune_model(X, y):
+# upper bound on boosting rounds; early stopping picks the actual count per fold
+MAX_ROUNDS = 800
+EARLY_STOPPING_ROUNDS = 50
+
+
+# search spaces: "base" (tune_model's original space) and "full" (adds regularization, as in phase 2)
+def _suggest_params(trial, space: str) -> dict:
+    params = {
+        "n_estimators": trial.suggest_int("n_estimators", 300, MAX_ROUNDS),
+        "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.2),
+        "max_depth": trial.suggest_int("max_depth", 3, 10),
+        "subsample": trial.suggest_float("subsample", 0.5, 1.0),
+        "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
+    }
+    if space == "full":
+        params.update({
+            "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
+            "gamma": trial.suggest_float("gamma", 0, 5),
+            "reg_alpha": trial.suggest_float("reg_alpha", 0, 5),
+            "reg_lambda": trial.suggest_float("reg_lambda", 0, 5),
+        })
+    return params
+
+
+# Build the fold matrices once: the training side is a QuantileDMatrix (features binned a single
+# time for the hist tree method), the validation side references its bins
+def build_folds(X, y, n_folds: int = 3, seed: int = 42) -> list:
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    folds = []
+    for train_idx, valid_idx in StratifiedKFold(n_folds, shuffle=True, random_state=seed).split(X, y):
+        dtrain = xgb.QuantileDMatrix(X[train_idx], y[train_idx])
+        dvalid = xgb.QuantileDMatrix(X[valid_idx], y[valid_idx], ref=dtrain)
+        folds.append((dtrain, dvalid, y[valid_idx]))
+    return folds
+
+
+# tune function: parallel trials, pruning on the running mean recall after each fold, early
+# stopping, and an optional persistent study (e.g. storage="sqlite:///optuna.db") that later runs resume
+def tune_model(X, y, n_trials: int = 20, n_folds: int = 3, n_jobs: int = -1, threshold: float = 0.5,
+               scale_pos_weight: float = None, space: str = "base", storage: str = None,
+               study_name: str = "xgb-churn", seed: int = 42) -> dict:
+
+    folds = build_folds(X, y, n_folds, seed)
+
+    # split the cores between concurrent trials instead of oversubscribing them
+    n_cpus = os.cpu_count() or 1
+    n_jobs = n_cpus if n_jobs == -1 else max(1, n_jobs)
+    threads_per_trial = max(1, n_cpus // n_jobs)
 
     def objective(trial):
         #try these parameters
-        params = {
-            "n_estimators": trial.suggest_int("n_estimators", 300, 800),
-            "learning_rate": trial.suggest_float("learning_rate", 0.01, 0.2),
-            "max_depth": trial.suggest_int("max_depth", 3, 10),
-            "subsample": trial.suggest_float("subsample", 0.5, 1.0),
-            "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
-            "random_state": 42,
-            "n_jobs": -1,
-            "eval_metric": "logloss"
+        params = _suggest_params(trial, space)
+        num_rounds = params.pop("n_estimators")
+        booster_params = {
+            **params,
+            "objective": "binary:logistic",
+            "eval_metric": "auc",
+            "tree_method": "hist",
+            "nthread": threads_per_trial,
+            "seed": seed,
         }
-        model = XGBClassifier(**params)
-        scores = cross_val_score(model, X, y, cv=3, scoring="recall") #cross validation with 3 folds
-        return scores.mean()
+        if scale_pos_weight is not None:
+            booster_params["scale_pos_weight"] = scale_pos_weight
+
+        recalls, rounds = [], []
+        for k, (dtrain, dvalid, y_valid) in enumerate(folds):
+            booster = xgb.train(
+                booster_params, dtrain, num_boost_round=num_rounds,
+                evals=[(dvalid, "valid")], early_stopping_rounds=EARLY_STOPPING_ROUNDS, verbose_eval=False,
+            )
+            best = booster.best_iteration + 1
+            proba = booster.predict(dvalid, iteration_range=(0, best))
+            y_pred = proba >= threshold
+            recalls.append(y_pred[y_valid == 1].mean())  # recall of the churn class
+            rounds.append(best)
+
+            # prune on the objective itself: one value per fold (step = fold index), so every
+            # trial's step k is the mean recall over the same first k + 1 folds
+            trial.report(float(np.mean(recalls)), k)
+            if k < len(folds) - 1 and trial.should_prune():
+                raise optuna.TrialPruned(f"Pruned after fold {k + 1} (mean recall {np.mean(recalls):.3f})")
+
+        trial.set_user_attr("best_rounds", int(np.mean(rounds)))
+        return float(np.mean(recalls))
 
     #Optuna tuning
-    study = optuna.create_study(direction="maximize")
-    study.optimize(objective, n_trials=20)
+    study = optuna.create_study(
+        direction="maximize",
+        study_name=study_name,
+        storage=storage,
+        load_if_exists=storage is not None,  # resume the stored study
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0),
+    )
+
+    # only run the trials a resumed study is still missing
+    done = len([t for t in study.trials if t.state in (optuna.trial.TrialState.COMPLETE,
+                                                        optuna.trial.TrialState.PRUNED)])
+    remaining = max(0, n_trials - done)
+    if done:
+        print(f"Resuming study '{study_name}': {done} trials done, {remaining} to go")
+    study.optimize(objective, n_trials=remaining, n_jobs=n_jobs)
+
+    pruned = len([t for t in study.trials if t.state == optuna.trial.TrialState.PRUNED])
+    print(f"Finished {len(study.trials)} trials ({pruned} pruned)")
 
-    # best parameters after tuning
-    print("Best Params:", study.best_params)
-    return study.best_params
\ No newline at end of file
+    # best parameters after tuning; n_estimators is the early-stopped round count the best
+    # trial actually used, not the sampled upper bound
+    best_params = dict(study.best_params)
+    best_rounds = study.best_trial.user_attrs.get("best_rounds")
+    if best_rounds is not None:
+        best_params["n_estimators"] = best_rounds
+    print("Best Params:", best_params)
+    print("Best rounds (early stopping):", best_rounds)
+    return best_params
@@ -0,0 +1,248 @@
+### audit.py
+
+# Imports
+import os
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.data.load_data import RAW_DTYPES
+from src.serving.utils import get_logger
+
+log = get_logger("audit")
+
+# Prediction audit log (off unless AUDIT_DIR is set): buffered rows are written as one Parquet
+# row group every AUDIT_FLUSH_ROWS rows or AUDIT_FLUSH_SECONDS, files rotate after
+# AUDIT_FILE_ROWS rows or AUDIT_FILE_SECONDS. Past AUDIT_MAX_PENDING_ROWS unwritten rows new
+# rows are dropped (and counted) instead of making requests wait for the disk.
+AUDIT_DIR = os.environ.get("AUDIT_DIR")
+AUDIT_FLUSH_ROWS = int(os.environ.get("AUDIT_FLUSH_ROWS", "10000"))
+AUDIT_FLUSH_SECONDS = float(os.environ.get("AUDIT_FLUSH_SECONDS", "5"))
+AUDIT_FILE_ROWS = int(os.environ.get("AUDIT_FILE_ROWS", "1000000"))
+AUDIT_FILE_SECONDS = float(os.environ.get("AUDIT_FILE_SECONDS", "3600"))
+AUDIT_MAX_PENDING_ROWS = int(os.environ.get("AUDIT_MAX_PENDING_ROWS", "1000000"))
+
+# columns added to the raw extract layout; run_pipeline.py reads everything else
+AUDIT_PREFIX = "audit_"
+LABELS = ["Not likely to churn", "Likely to churn"]
+
+# raw columns are written in the layout of the training extract (src/data/load_data.py), wide
+# enough for any request value; Churn stays empty until the outcome is known
+_RAW_TYPES = {
+    c: pa.string() if t in ("object", "category") else pa.int64() if t.startswith("Int") else pa.float64()
+    for c, t in RAW_DTYPES.items()
+}
+
+
+# Columns of an audit file or directory that run_pipeline.py should train on (the raw extract
+# columns), None when the path is not an audit file
+def training_columns(path: str):
+    if not (path.endswith(".parquet") or os.path.isdir(path)):
+        return None
+    import pyarrow.dataset as ds
+    names = ds.dataset(path, format="parquet").schema.names
+    if not any(c.startswith(AUDIT_PREFIX) for c in names):
+        return None
+    return [c for c in names if not c.startswith(AUDIT_PREFIX)]
+
+
+# Append-only audit log of served predictions. Request threads only append a reference to the
+# request's inputs and results; the Arrow conversion, feature encoding and Parquet writes happen
+# on one background thread. In-progress files are hidden (".audit-*.inprogress", skipped by
+# Parquet dataset readers) and renamed once closed.
+class AuditSink:
+
+    def __init__(self, directory: str, flush_rows: int = AUDIT_FLUSH_ROWS,
+                 flush_seconds: float = AUDIT_FLUSH_SECONDS, file_rows: int = AUDIT_FILE_ROWS,
+                 file_seconds: float = AUDIT_FILE_SECONDS, max_pending_rows: int = AUDIT_MAX_PENDING_ROWS):
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.file_rows = file_rows
+        self.file_seconds = file_seconds
+        self.max_pending_rows = max_pending_rows
+        os.makedirs(directory, exist_ok=True)
+
+        self._pending = []
+        self._pending_rows = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._writer = None
+        self._path = None
+        self._file_rows = 0
+        self._file_opened = 0.0
+        self._file_seq = 0
+
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.files_written = 0
+        self.write_errors = 0
+        self.last_flush_ms = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    # Buffer one request: inputs are the scored records (list of dicts) or the decoded columnar
+    # frame, results the per-record result dicts or a probability array (labelled here with the
+    # model's threshold). `model` is the ServingModel whose encoder fills the feature column.
+    # Returns False when the rows were dropped because the writer is too far behind.
+    def record(self, endpoint: str, request_id: str, model_id: str, model, inputs, results,
+               latency_ms: float) -> bool:
+        n = len(results)
+        if self._pending_rows + n > self.max_pending_rows:
+            self.rows_dropped += n
+            return False
+        chunk = (time.time(), endpoint, request_id, model_id, model, inputs, results, latency_ms)
+        with self._lock:
+            self._pending.append(chunk)
+            self._pending_rows += n
+        if self._pending_rows >= self.flush_rows:
+            self._wake.set()
+        return True
+
+    # Write out everything buffered and close the current file (shutdown)
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        else:
+            self.flush()
+            self._close_file()
+
+    def stats(self) -> dict:
+        return {
+            "dir": self.directory,
+            "rows_written": self.rows_written,
+            "rows_dropped": self.rows_dropped,
+            "pending_rows": self._pending_rows,
+            "files_written": self.files_written,
+            "write_errors": self.write_errors,
+            "last_flush_ms": self.last_flush_ms,
+            "current_file": self._path,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+        self.flush()
+        self._close_file()
+
+    # Convert the buffered requests and write them as one row group per schema
+    def flush(self):
+        with self._lock:
+            chunks, self._pending = self._pending, []
+            self._pending_rows = 0
+        if self._writer is not None and time.time() - self._file_opened >= self.file_seconds:
+            self._close_file()
+        if not chunks:
+            return
+
+        t0 = time.perf_counter()
+        tables = []
+        for chunk in chunks:
+            try:
+                tables.append(self._to_table(chunk))
+            except Exception as e:
+                self.write_errors += 1
+                self.rows_dropped += len(chunk[6])
+                log.error("Could not convert audit rows of request %s: %s", chunk[2], e)
+
+        # consecutive requests scored with the same feature layout share a row group
+        groups = []
+        for table in tables:
+            if groups and groups[-1][0].schema.equals(table.schema, check_metadata=True):
+                groups[-1].append(table)
+            else:
+                groups.append([table])
+        for group in groups:
+            table = pa.concat_tables(group)
+            try:
+                self._write(table)
+            except Exception as e:
+                self.write_errors += 1
+                self.rows_dropped += len(table)
+                log.error("Could not write %d audit rows to %s: %s", len(table), self._path, e)
+                self._close_file()
+        self.last_flush_ms = (time.perf_counter() - t0) * 1000
+
+    # One request -> Arrow table: raw extract columns, then the audit columns and the encoded
+    # feature vector (feature names in the schema metadata)
+    def _to_table(self, chunk) -> pa.Table:
+        ts, endpoint, request_id, model_id, model, inputs, results, latency_ms = chunk
+        frame = inputs if isinstance(inputs, pd.DataFrame) else pd.DataFrame.from_records(inputs)
+        n = len(results)
+
+        if isinstance(results, np.ndarray):
+            proba = results.astype(np.float64, copy=False)
+            labels = pa.DictionaryArray.from_arrays((proba >= model.threshold).astype(np.int8), pa.array(LABELS))
+            labels = labels.cast(pa.string())
+        else:
+            proba = np.fromiter((r["churn_probability"] for r in results), dtype=np.float64, count=n)
+            labels = pa.array([r["prediction"] for r in results], type=pa.string())
+
+        columns = {}
+        for col, arrow_type in _RAW_TYPES.items():
+            if col in frame.columns:
+                columns[col] = pa.array(frame[col], from_pandas=True).cast(arrow_type)
+            elif col == "customerID":
+                columns[col] = pa.array([f"{request_id}-{i}" for i in range(n)], type=pa.string())
+            else:
+                columns[col] = pa.nulls(n, arrow_type)
+
+        if isinstance(inputs, pd.DataFrame):
+            X = model.encoder.transform_frame(inputs)
+        else:
+            X = model.encoder.transform(inputs)
+        X = np.ascontiguousarray(X, dtype=np.float32)
+
+        columns.update({
+            "audit_ts": pa.array(np.full(n, int(ts * 1e6), dtype=np.int64), type=pa.timestamp("us", tz="UTC")),
+            "audit_request_id": pa.array([request_id] * n, type=pa.string()),
+            "audit_endpoint": pa.array([endpoint] * n, type=pa.string()),
+            "audit_model_id": pa.array([model_id] * n, type=pa.string()),
+            "audit_churn_probability": pa.array(proba, type=pa.float64()),
+            "audit_prediction": labels,
+            "audit_latency_ms": pa.array(np.full(n, latency_ms, dtype=np.float64)),
+            "audit_features": pa.FixedSizeListArray.from_arrays(pa.array(X.ravel()), X.shape[1]),
+        })
+        table = pa.table(columns)
+        return table.replace_schema_metadata({"feature_cols": json.dumps(list(model.feature_cols))})
+
+    def _write(self, table: pa.Table):
+        if self._writer is not None and not self._writer.schema.equals(table.schema, check_metadata=True):
+            self._close_file()  # a reloaded model with another feature layout starts a new file
+        if self._writer is None:
+            self._open_file(table.schema)
+        self._writer.write_table(table, row_group_size=len(table))
+        self._file_rows += len(table)
+        self.rows_written += len(table)
+        if self._file_rows >= self.file_rows:
+            self._close_file()
+
+    def _open_file(self, schema: pa.Schema):
+        self._file_seq += 1
+        name = f"audit-{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}-{os.getpid()}-{self._file_seq:04d}.parquet"
+        self._path = os.path.join(self.directory, name)
+        self._writer = pq.ParquetWriter(os.path.join(self.directory, f".{name}.inprogress"), schema)
+        self._file_rows = 0
+        self._file_opened = time.time()
+
+    def _close_file(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(os.path.join(self.directory, f".{os.path.basename(self._path)}.inprogress"), self._path)
+        self.files_written += 1
+        log.info("Closed audit file %s (%d rows)", self._path, self._file_rows)
+        self._writer, self._path = None, None
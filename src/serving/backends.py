@@ -0,0 +1,90 @@
+### backends.py
+
+# Imports
+import os
+import pickle
+import numpy as np
+from src.serving.tree_model import TreeEnsemble
+
+# Pickled sklearn model inside the MLflow model directory (MLmodel -> sklearn.pickled_model)
+PICKLED_MODEL = "model.pkl"
+
+# Flattened ensemble written next to feature_columns.txt (see src/models/export_trees.py)
+TREE_MODEL_FILE = "tree_model.npz"
+# Same arrays as one .npy per table, memory-mapped when present (see src/serving/shared.py)
+TREE_TABLES_DIR = "tree_tables"
+
+
+# MLflow pyfunc backend: goes through the pyfunc wrapper and the sklearn XGBClassifier
+class PyfuncBackend:
+
+    name = "pyfunc"
+
+    def __init__(self, model_dir: str):
+        import mlflow  # only this backend needs mlflow at serving time
+
+        self.model = mlflow.pyfunc.load_model(model_dir)  # load with pyfunc to ensure compatibility
+        # pyfunc.predict only exposes hard labels, so probabilities come from the underlying classifier
+        self._clf = self.model.get_raw_model()
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self._clf.predict_proba(X)[:, 1]
+
+    # Underlying XGBoost Booster (used for TreeSHAP explanations)
+    def get_booster(self):
+        return self._clf.get_booster()
+
+
+# Native XGBoost backend: pulls the Booster out of model.pkl and predicts in place on NumPy arrays
+class BoosterBackend:
+
+    name = "booster"
+
+    def __init__(self, model_dir: str):
+        with open(os.path.join(model_dir, PICKLED_MODEL), "rb") as f:
+            clf = pickle.load(f)  # cloudpickle output is readable by the standard unpickler
+        self.booster = clf.get_booster()
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # inplace_predict skips DMatrix construction; columns are already in training order
+        return self.booster.inplace_predict(X, validate_features=False)
+
+    def get_booster(self):
+        return self.booster
+
+
+# Flattened tree arrays exported at training time (src/models/export_trees.py), scored with NumPy only
+class TreeBackend:
+
+    name = "trees"
+
+    def __init__(self, model_dir: str):
+        self.model_dir = model_dir
+        tables = os.path.join(model_dir, TREE_TABLES_DIR)
+        if os.path.isdir(tables):
+            self.ensemble = TreeEnsemble.load(tables)
+        else:
+            self.ensemble = TreeEnsemble.load(os.path.join(model_dir, TREE_MODEL_FILE))
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self.ensemble.predict_proba(X)
+
+    # The NumPy tables cannot produce TreeSHAP values: read the Booster from model.pkl on demand
+    # (this imports xgboost)
+    def get_booster(self):
+        with open(os.path.join(self.model_dir, PICKLED_MODEL), "rb") as f:
+            return pickle.load(f).get_booster()
+
+
+BACKENDS = {
+    "booster": BoosterBackend,
+    "pyfunc": PyfuncBackend,
+    "trees": TreeBackend,
+}
+
+
+# Build the requested serving backend
+def load_backend(model_dir: str, name: str = "booster"):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown serving backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](model_dir)
@@ -0,0 +1,85 @@
+### batcher.py
+
+# Imports
+import asyncio
+
+
+# Dynamic micro-batcher: concurrent single-record requests are collected for up to
+# max_wait_ms or max_batch_size records and scored with one predict_batch call
+class MicroBatcher:
+
+    def __init__(self, predict_batch_fn, max_batch_size: int = 64, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_batch_fn = predict_batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        # fail anything still queued instead of leaving callers waiting forever
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    # Queue one record and wait for its own result
+    async def submit(self, record: dict) -> dict:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((record, future))
+        return await future
+
+    # Take what is queued now, then wait for more until the batch is full or the deadline passes
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # callers that went away (client disconnect) are not scored
+            batch = [(r, f) for r, f in batch if not f.cancelled()]
+            if not batch:
+                continue
+
+            # one vectorized transform + predict for the whole batch, off the event loop;
+            # requests arriving meanwhile queue up for the next batch
+            try:
+                results = await loop.run_in_executor(None, self.predict_batch_fn, [r for r, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,97 @@
+### cache.py
+
+# Imports
+import time
+import threading
+from collections import OrderedDict
+from src.serving.encoder import _to_float
+
+
+# Bounded LRU cache of prediction results with optional TTL, keyed by the canonical
+# form of the features the model actually sees, and tied to one model id
+class PredictionCache:
+
+    def __init__(self, max_size: int, ttl_seconds: float = 0, quantum: float = 0):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.ttl = ttl_seconds        # 0 = entries never expire
+        self.quantum = quantum        # 0 = numeric fields must match exactly
+
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.model_id = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # Canonical key for one record: cleaned categoricals plus (optionally quantized) numerics,
+    # in the encoder's column order, so equivalent payloads share an entry
+    def key(self, record: dict, encoder) -> tuple:
+        parts = []
+        for col in encoder.numeric_cols:
+            value = _to_float(record.get(col))
+            if self.quantum:
+                value = round(value / self.quantum)
+            parts.append(value)
+        for col in encoder.categorical_cols:
+            parts.append(str(record.get(col)).strip())
+        return tuple(parts)
+
+    # Drop everything when the serving model changes
+    def check_model(self, model_id: str):
+        if model_id != self.model_id:
+            with self._lock:
+                if model_id != self.model_id:
+                    if self._entries:
+                        self.invalidations += 1
+                    self._entries.clear()
+                    self.model_id = model_id
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "quantum": self.quantum,
+            "model_id": self.model_id,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
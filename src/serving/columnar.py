@@ -0,0 +1,75 @@
+### columnar.py
+
+# Imports
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# request / response content types of POST /predict/columnar
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/x-msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/msgpack")
+
+# labels of the dictionary-encoded "prediction" column, index = churn flag
+LABELS = ["Not likely to churn", "Likely to churn"]
+
+
+# Arrow IPC stream -> DataFrame for the encoder. The body buffer is read without copying, numeric
+# columns convert zero-copy when they have no nulls, and string columns are dictionary-encoded by
+# Arrow first so pandas gets Categoricals (codes + a handful of categories) instead of one Python
+# string per row.
+def decode_arrow(body: bytes) -> pd.DataFrame:
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    columns = []
+    for column in table.columns:
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            column = pc.dictionary_encode(column)
+        columns.append(column)
+    table = pa.table(columns, names=table.column_names)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+# MessagePack column map -> DataFrame. A column is either a plain list of values or a typed
+# buffer {"dtype": "<f8", "data": <bin>} read in place with np.frombuffer; string lists
+# become Categoricals like the Arrow path.
+def decode_msgpack(body: bytes) -> pd.DataFrame:
+    import msgpack  # optional: only this content type needs it
+
+    data = msgpack.unpackb(body, raw=False)
+    if not isinstance(data, dict):
+        raise ValueError("MessagePack payload must be a map of column name -> values")
+    columns = {}
+    for name, values in data.items():
+        if isinstance(values, dict):
+            columns[name] = np.frombuffer(values["data"], dtype=np.dtype(values["dtype"]))
+        elif values and isinstance(values[0], str):
+            columns[name] = pd.Categorical(values)
+        else:
+            columns[name] = np.asarray(values)
+    return pd.DataFrame(columns, copy=False)
+
+
+# Columnar response: churn_probability (float64) and prediction (dictionary-encoded label),
+# with the threshold and model id in the schema metadata
+def encode_arrow(proba: np.ndarray, threshold: float, model_id: str) -> bytes:
+    flags = (proba >= threshold).astype(np.int8)
+    batch = pa.record_batch(
+        [pa.array(proba, type=pa.float64()), pa.DictionaryArray.from_arrays(flags, pa.array(LABELS))],
+        names=["churn_probability", "prediction"],
+    ).replace_schema_metadata({"threshold": str(threshold), "model_id": model_id})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+def encode_msgpack(proba: np.ndarray, threshold: float, model_id: str) -> bytes:
+    import msgpack
+
+    flags = (proba >= threshold).astype(np.uint8)
+    return msgpack.packb({
+        "churn_probability": {"dtype": "<f8", "data": np.ascontiguousarray(proba, dtype="<f8").tobytes()},
+        "likely_to_churn": {"dtype": "|u1", "data": flags.tobytes()},
+        "threshold": threshold,
+        "model_id": model_id,
+    })
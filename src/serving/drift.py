@@ -0,0 +1,186 @@
+### drift.py
+
+# Imports
+import json
+import threading
+import numpy as np
+
+# reference snapshot written next to feature_columns.txt at training time
+DRIFT_REFERENCE_FILE = "drift_reference.json"
+
+# numeric features are binned on training quantiles (at most DRIFT_BINS bins)
+DRIFT_BINS = 10
+# proportions are floored at this value so empty bins do not make PSI infinite
+PSI_EPSILON = 1e-4
+# usual PSI reading: < 0.1 stable, 0.1 - 0.25 moderate shift, > 0.25 drift
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.25
+# below this many live rows the report says "insufficient_data" instead of flagging drift
+DRIFT_MIN_ROWS = 100
+# batches up to this size are binned with one broadcast comparison (fewer NumPy calls),
+# larger ones with one searchsorted per column (less work per row)
+BROADCAST_MAX_ROWS = 32
+
+
+# Reference snapshot from the encoded training matrix: training-quantile bin edges and counts
+# for the numeric columns, counts of ones for the binary / one-hot columns
+def build_reference(X, feature_cols: list, numeric_cols: list, n_bins: int = DRIFT_BINS) -> dict:
+    X = np.asarray(X, dtype=np.float64)
+    pos = {c: i for i, c in enumerate(feature_cols)}
+    numeric = {}
+    for col in numeric_cols:
+        x = X[:, pos[col]]
+        x = x[~np.isnan(x)]
+        edges = np.unique(np.quantile(x, np.linspace(0, 1, n_bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, x, side="right"), minlength=len(edges) + 1)
+        numeric[col] = {"edges": edges.tolist(), "counts": counts.tolist()}
+    categorical = [c for c in feature_cols if c not in numeric]
+    ones = (X[:, [pos[c] for c in categorical]] > 0.5).sum(axis=0)
+    return {
+        "rows": len(X),
+        "feature_cols": list(feature_cols),
+        "numeric": numeric,
+        "categorical": {c: int(n) for c, n in zip(categorical, ones)},
+    }
+
+# Add newly trained-on rows (encoded, same column order) to a snapshot: the bin edges are kept,
+# counts grow, so a continued model's snapshot covers every row it was trained on
+def extend_reference(reference: dict, X) -> dict:
+    X = np.asarray(X, dtype=np.float64)
+    pos = {c: i for i, c in enumerate(reference["feature_cols"])}
+    numeric = {}
+    for col, ref in reference["numeric"].items():
+        x = X[:, pos[col]]
+        x = x[~np.isnan(x)]
+        edges = np.asarray(ref["edges"])
+        counts = np.asarray(ref["counts"]) + np.bincount(np.searchsorted(edges, x, side="right"),
+                                                         minlength=len(edges) + 1)
+        numeric[col] = {"edges": ref["edges"], "counts": counts.tolist()}
+    categorical = {c: int(n + (X[:, pos[c]] > 0.5).sum()) for c, n in reference["categorical"].items()}
+    return {**reference, "rows": reference["rows"] + len(X), "numeric": numeric, "categorical": categorical}
+
+def save_reference(reference: dict, path: str) -> str:
+    with open(path, "w") as f:
+        json.dump(reference, f)
+    return path
+
+
+# Population stability index between two count vectors
+def psi(expected, actual) -> float:
+    e = np.maximum(np.asarray(expected, dtype=np.float64) / max(np.sum(expected), 1), PSI_EPSILON)
+    a = np.maximum(np.asarray(actual, dtype=np.float64) / max(np.sum(actual), 1), PSI_EPSILON)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+# Kolmogorov-Smirnov statistic on binned counts (max CDF gap at the bin edges, a lower
+# bound of the exact statistic)
+def binned_ks(expected, actual) -> float:
+    e = np.cumsum(expected) / max(np.sum(expected), 1)
+    a = np.cumsum(actual) / max(np.sum(actual), 1)
+    return float(np.max(np.abs(a - e)))
+
+
+# Streaming comparison of scored rows against the training reference. State is fixed-size
+# (one count per numeric bin, one count per binary / one-hot column), updated once per batch
+# with a few vectorized NumPy calls. Like the metrics, counts are sharded per thread so the
+# hot path takes no lock; shards are summed when a report is requested.
+class DriftMonitor:
+
+    def __init__(self, reference: dict):
+        self.reference = reference
+        self.feature_cols = reference["feature_cols"]
+        pos = {c: i for i, c in enumerate(self.feature_cols)}
+
+        # numeric columns share one flat bin array: column j's bins start at offsets[j];
+        # edges are also padded with +inf into one (columns, max edges) matrix so small
+        # batches bin every column with a single broadcast comparison
+        self.numeric_cols = list(reference["numeric"])
+        self._numeric_idx = np.array([pos[c] for c in self.numeric_cols], dtype=np.intp)
+        self._edges = [np.asarray(reference["numeric"][c]["edges"], dtype=np.float64) for c in self.numeric_cols]
+        sizes = [len(e) + 1 for e in self._edges]
+        self._offsets = np.cumsum([0] + sizes[:-1]).astype(np.intp)
+        self._n_bins = int(sum(sizes))
+        self._edge_matrix = np.full((len(self._edges), max(sizes, default=1) - 1), np.inf)
+        for j, edges in enumerate(self._edges):
+            self._edge_matrix[j, :len(edges)] = edges
+
+        self.categorical_cols = list(reference["categorical"])
+        self._categorical_idx = np.array([pos[c] for c in self.categorical_cols], dtype=np.intp)
+
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()  # only taken the first time a thread updates
+
+    @classmethod
+    def load(cls, path: str) -> "DriftMonitor":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def _new_shard(self) -> dict:
+        # ones are summed straight from the 0/1 encoded values, exact in float64
+        return {"rows": 0, "bins": np.zeros(self._n_bins, dtype=np.int64),
+                "ones": np.zeros(len(self.categorical_cols), dtype=np.float64)}
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    # Add an encoded batch (n_rows, n_features) in training column order
+    def update(self, X: np.ndarray):
+        if len(X) == 0:
+            return
+        shard = self._shard()
+        shard["rows"] += len(X)
+        # bin index = number of edges <= value (searchsorted side="right"), per column
+        numeric = X[:, self._numeric_idx]
+        if len(X) <= BROADCAST_MAX_ROWS:
+            bins = ((numeric[:, :, None] >= self._edge_matrix).sum(axis=2) + self._offsets).ravel()
+        else:
+            bins = np.concatenate([np.searchsorted(edges, numeric[:, j], side="right") + self._offsets[j]
+                                   for j, edges in enumerate(self._edges)])
+        shard["bins"] += np.bincount(bins, minlength=self._n_bins)
+        shard["ones"] += X[:, self._categorical_idx].sum(axis=0, dtype=np.float64)
+
+    # Drop the live counts (e.g. to start a new monitoring window)
+    def reset(self):
+        for shard in list(self._shards):
+            shard["rows"] = 0
+            shard["bins"][:] = 0
+            shard["ones"][:] = 0.0
+
+    # Per-feature PSI (and binned KS for numeric features) of the live window vs the reference
+    def report(self, min_rows: int = DRIFT_MIN_ROWS) -> dict:
+        shards = list(self._shards)
+        rows = sum(s["rows"] for s in shards)
+        bins = sum((s["bins"] for s in shards), np.zeros(self._n_bins, dtype=np.int64))
+        ones = sum((s["ones"] for s in shards), np.zeros(len(self.categorical_cols))).astype(np.int64)
+        ref_rows = self.reference["rows"]
+
+        features = {}
+        for j, col in enumerate(self.numeric_cols):
+            live = bins[self._offsets[j]:self._offsets[j] + len(self._edges[j]) + 1]
+            ref = self.reference["numeric"][col]["counts"]
+            features[col] = {"psi": psi(ref, live), "ks": binned_ks(ref, live),
+                             "reference": ref, "live": live.tolist()}
+        for j, col in enumerate(self.categorical_cols):
+            ref_ones = self.reference["categorical"][col]
+            features[col] = {
+                "psi": psi([ref_rows - ref_ones, ref_ones], [rows - ones[j], ones[j]]),
+                "reference_rate": ref_ones / max(ref_rows, 1),
+                "live_rate": float(ones[j]) / rows if rows else None,
+            }
+
+        if rows < min_rows:
+            status = "insufficient_data"
+        else:
+            worst = max(f["psi"] for f in features.values())
+            status = "drift" if worst > PSI_DRIFT else "moderate" if worst > PSI_MODERATE else "stable"
+        drifted = sorted((c for c, f in features.items() if f["psi"] > PSI_DRIFT),
+                         key=lambda c: -features[c]["psi"])
+        return {"status": status, "rows": rows, "reference_rows": ref_rows,
+                "drifted_features": drifted if rows >= min_rows else [], "features": features}
@@ -0,0 +1,108 @@
+### encoder.py
+
+# Imports
+import math
+import numpy as np
+import pandas as pd
+from src.features.build_features import FeatureEncoder
+
+# binary feature mappings (same deterministic mapping build_features learns during training),
+# used when a model directory only has feature_columns.txt
+BINARY_MAP = {
+    "gender": {"Female": 0, "Male": 1},
+    "Partner": {"No": 0, "Yes": 1},
+    "Dependents": {"No": 0, "Yes": 1},
+    "PhoneService": {"No": 0, "Yes": 1},
+    "PaperlessBilling": {"No": 0, "Yes": 1},
+}
+
+# Convert a raw value to float, invalid or missing values become 0 (same as to_numeric + fillna(0))
+def _to_float(value) -> float:
+    try:
+        out = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(out) else out
+
+# From this many records on, transform() builds a DataFrame and takes the vectorized path
+# (measured crossover on the Telco features: ~11ms per-record vs ~10ms frame at 2k rows,
+# 57ms vs 38ms at 10k; below it the DataFrame construction dominates)
+FRAME_MIN_ROWS = 2048
+
+
+# Record encoder compiled once from the training FeatureEncoder (the same object build_features
+# fits), with flattened lookups for the per-record dict path
+class CompiledEncoder:
+
+    def __init__(self, feature_encoder: FeatureEncoder):
+
+        self.feature_encoder = feature_encoder
+        self.feature_cols = list(feature_encoder.feature_cols)
+        self.n_features = len(self.feature_cols)
+        pos = {name: i for i, name in enumerate(self.feature_cols)}
+
+        # raw column -> output index (passed through as numbers)
+        self.numeric_index = {c: pos[c] for c in feature_encoder.numeric_cols}
+        # raw column -> (output index, value mapping)
+        self.binary_index = {c: (pos[c], m) for c, m in feature_encoder.binary.items()}
+        # (raw column, category value) -> output index for one-hot columns
+        self.onehot_index = {
+            (c, v): pos[f"{c}_{v}"] for c, values in feature_encoder.onehot.items() for v in values
+        }
+
+        self.onehot_cols = sorted(feature_encoder.onehot)
+
+        # raw input fields the encoded vector depends on
+        self.numeric_cols = list(self.numeric_index)
+        self.categorical_cols = list(self.binary_index) + self.onehot_cols
+
+        # Flattened lookups used on the per-record hot path
+        self._numeric = list(self.numeric_index.items())
+        self._binary = [(c, i, m) for c, (i, m) in self.binary_index.items()]
+        self._onehot = [
+            (col, {v: i for (c, v), i in self.onehot_index.items() if c == col})
+            for col in self.onehot_cols
+        ]
+
+    # Model directories without a pickled encoder: rebuild it from feature_columns.txt
+    @classmethod
+    def from_feature_columns(cls, feature_cols: list, binary_map: dict = BINARY_MAP) -> "CompiledEncoder":
+        return cls(FeatureEncoder.from_feature_columns(feature_cols, binary_map))
+
+    @classmethod
+    def from_file(cls, feature_file: str, binary_map: dict = BINARY_MAP) -> "CompiledEncoder":
+        with open(feature_file) as f:
+            return cls.from_feature_columns([ln.strip() for ln in f if ln.strip()], binary_map)
+
+    # Encode a list of record dicts into a (n_records, n_features) float32 matrix
+    def transform(self, records: list) -> np.ndarray:
+
+        if len(records) >= FRAME_MIN_ROWS:
+            return self.transform_frame(pd.DataFrame.from_records(records))
+
+        # rows are filled as plain Python lists and copied into the float32 matrix in one go
+        X = np.zeros((len(records), self.n_features), dtype=np.float32)
+        blank = [0.0] * self.n_features
+
+        for r, record in enumerate(records):
+            row = blank.copy()
+            for col, i in self._numeric:
+                row[i] = _to_float(record.get(col))
+            for col, i, mapping in self._binary:
+                row[i] = mapping.get(str(record.get(col)).strip(), 0)
+            for col, values in self._onehot:
+                i = values.get(str(record.get(col)).strip())
+                if i is not None:
+                    row[i] = 1.0
+            X[r] = row
+
+        return X
+
+    # Encode a single record into a (1, n_features) float32 row
+    def transform_one(self, record: dict) -> np.ndarray:
+        return self.transform([record])
+
+    # Vectorized encoding of a column mapping / DataFrame into a float32 matrix (category codes,
+    # same code path as training)
+    def transform_frame(self, df) -> np.ndarray:
+        return self.feature_encoder.transform(df)
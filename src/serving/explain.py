@@ -0,0 +1,52 @@
+### explain.py
+
+# Imports
+import numpy as np
+
+# contributions returned per customer unless the request asks for another k
+DEFAULT_TOP_K = 5
+
+
+# Per-customer explanations from XGBoost's native TreeSHAP (pred_contribs): one booster call per
+# batch, then the encoded columns are summed back to the raw CustomerData fields (a one-hot
+# group such as Contract_One year / Contract_Two year becomes "Contract") with one matmul
+class Explainer:
+
+    def __init__(self, booster, encoder):
+        import xgboost as xgb  # only explanations need xgboost on the "trees" backend
+
+        self._DMatrix = xgb.DMatrix
+        self.booster = booster
+        self.feature_cols = encoder.feature_cols
+
+        # encoded column -> raw field, in the order the fields are reported
+        field_of = {i: c for c, i in encoder.numeric_index.items()}
+        field_of.update({i: c for c, (i, _) in encoder.binary_index.items()})
+        field_of.update({i: c for (c, _), i in encoder.onehot_index.items()})
+        self.fields = list(dict.fromkeys(field_of[i] for i in range(len(self.feature_cols))))
+        pos = {f: j for j, f in enumerate(self.fields)}
+        self._to_fields = np.zeros((len(self.feature_cols), len(self.fields)), dtype=np.float32)
+        for i in range(len(self.feature_cols)):
+            self._to_fields[i, pos[field_of[i]]] = 1.0
+
+    # Explainer for a loaded ServingModel: reuses the booster of the "booster"/"pyfunc" backends,
+    # the NumPy "trees" backend reads model.pkl once for it
+    @classmethod
+    def for_model(cls, m) -> "Explainer":
+        return cls(m.backend.get_booster(), m.encoder)
+
+    # (n, n_fields) contributions in log-odds and the (n,) bias (expected margin) for an
+    # encoded float32 batch; margin = bias + row sum
+    def contributions(self, X: np.ndarray):
+        contribs = self.booster.predict(self._DMatrix(X, feature_names=None), pred_contribs=True,
+                                        validate_features=False)
+        return contribs[:, :-1] @ self._to_fields, contribs[:, -1]
+
+    # Indices of the k largest absolute contributions per row, largest first
+    @staticmethod
+    def top_k(field_contribs: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, field_contribs.shape[1])
+        magnitude = np.abs(field_contribs)
+        top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k]
+        order = np.take_along_axis(magnitude, top, axis=1).argsort(axis=1)[:, ::-1]
+        return np.take_along_axis(top, order, axis=1)
@@ -2,115 +2,467 @@
 
 # Imports
 import os
+import time
+import threading
+import numpy as np
 import pandas as pd
-import mlflow
+from src.serving.backends import load_backend
+from src.serving.cache import PredictionCache
+from src.serving.drift import DriftMonitor, DRIFT_REFERENCE_FILE
+from src.serving.encoder import CompiledEncoder
+from src.serving.explain import Explainer, DEFAULT_TOP_K
+from src.serving.utils import get_logger
+from src.serving.metrics import STAGE_SECONDS, BATCH_ROWS, PREDICTED_ROWS, MODEL_ERRORS, MODEL_RELOADS
 
-# model loading
-MODEL_DIR = "/app/model"
+log = get_logger("inference")
 
-try:
-    model = mlflow.pyfunc.load_model(MODEL_DIR) #load with pyfunc to ensure compatibility
-    print(f"Model loaded successfully from {MODEL_DIR}")
-except Exception as e:
-    print(f"Failed to load model from {MODEL_DIR}: {e}")
+# model location (a new model copied here can be hot-reloaded, see reload_model)
+MODEL_DIR = os.environ.get("MODEL_DIR", "/app/model")
 
+# "booster" (native XGBoost, default), "trees" (NumPy scorer, no xgboost import)
+# or "pyfunc" (MLflow wrapper fallback)
+SERVING_BACKEND = os.environ.get("SERVING_BACKEND", "booster")
 
-# Feature schema loading
-try:
-    feature_file = os.path.join(MODEL_DIR, "feature_columns.txt")
-    with open(feature_file) as f:
-        FEATURE_COLS = [ln.strip() for ln in f if ln.strip()]
-    print(f"Loaded {len(FEATURE_COLS)} feature columns from training")
-except Exception as e:
-    raise Exception(f"Failed to load feature columns: {e}")
+# Decision threshold: training run param (scripts/run_pipeline.py --threshold), env override
+DEFAULT_THRESHOLD = 0.5
 
-# Feature transformation constraints
+def _load_threshold(model_dir: str) -> float:
+    if os.environ.get("CHURN_THRESHOLD"):
+        return float(os.environ["CHURN_THRESHOLD"])
+    param_file = os.path.join(model_dir, "params", "threshold")
+    try:
+        with open(param_file) as f:
+            return float(f.read().strip())
+    except (OSError, ValueError) as e:
+        log.warning("No training threshold found (%s), using %s", e, DEFAULT_THRESHOLD)
+        return DEFAULT_THRESHOLD
+
+
+# Model id from the MLflow MLmodel file (falls back to the directory when it is missing)
+def _load_model_id(model_dir: str) -> str:
+    try:
+        with open(os.path.join(model_dir, "MLmodel")) as f:
+            for line in f:
+                if line.startswith("model_id:"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return os.path.abspath(model_dir)
+
+
+# Encoder fitted at training time (preprocessing.pkl), checked against feature_columns.txt;
+# older model directories without one rebuild it from the feature list
+def _load_encoder(model_dir: str) -> CompiledEncoder:
+    encoder = CompiledEncoder.from_file(os.path.join(model_dir, "feature_columns.txt"))
+    artifact_file = os.path.join(model_dir, "preprocessing.pkl")
+    if os.path.exists(artifact_file):
+        import joblib
+        fitted = joblib.load(artifact_file).get("encoder")
+        if fitted is not None:
+            if list(fitted.feature_cols) != encoder.feature_cols:
+                raise ValueError("preprocessing.pkl encoder does not match feature_columns.txt")
+            encoder = CompiledEncoder(fitted)
+    return encoder
+
+
+# Input-drift monitoring against the training snapshot (drift_reference.json), on by default
+# when the model directory has one; DRIFT_MONITOR=0 turns it off
+DRIFT_MONITOR = os.environ.get("DRIFT_MONITOR", "1") == "1"
+
+def _load_drift_monitor(model_dir: str, feature_cols: list):
+    path = os.path.join(model_dir, DRIFT_REFERENCE_FILE)
+    if not DRIFT_MONITOR or not os.path.exists(path):
+        return None
+    monitor = DriftMonitor.load(path)
+    if monitor.feature_cols != list(feature_cols):
+        log.warning("%s does not match feature_columns.txt, drift monitoring disabled", DRIFT_REFERENCE_FILE)
+        return None
+    return monitor
+
+
+# Optional prediction cache: PREDICTION_CACHE_SIZE entries (0 = off), TTL in seconds (0 = none),
+# numeric fields rounded to multiples of PREDICTION_CACHE_QUANTUM in the key (0 = exact)
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "0"))
+prediction_cache = None
+if PREDICTION_CACHE_SIZE > 0:
+    prediction_cache = PredictionCache(
+        PREDICTION_CACHE_SIZE,
+        ttl_seconds=float(os.environ.get("PREDICTION_CACHE_TTL", "0")),
+        quantum=float(os.environ.get("PREDICTION_CACHE_QUANTUM", "0")),
+    )
+
+
+# Explanation cache: per encoded feature vector (the same vector always gets the same
+# contributions), EXPLANATION_CACHE_SIZE entries (0 = off), cleared when the model changes
+EXPLANATION_CACHE_SIZE = int(os.environ.get("EXPLANATION_CACHE_SIZE", "4096"))
+explanation_cache = PredictionCache(EXPLANATION_CACHE_SIZE) if EXPLANATION_CACHE_SIZE > 0 else None
+
+
+# Everything a prediction needs, loaded together from one model directory
+class ServingModel:
+
+    def __init__(self, model_dir: str, backend: str):
+        self.model_dir = model_dir
+        self.model_id = _load_model_id(model_dir)
+
+        self.backend = load_backend(model_dir, backend)
+        log.info("Model loaded successfully from %s (%s backend)", model_dir, self.backend.name,
+                 extra={"model_id": self.model_id})
+
+        # Feature schema loading + encoder compilation
+        try:
+            self.encoder = _load_encoder(model_dir)
+        except Exception as e:
+            raise Exception(f"Failed to load feature columns: {e}")
+        self.feature_cols = self.encoder.feature_cols
+        log.info("Loaded %d feature columns from training", len(self.feature_cols))
+
+        self.threshold = _load_threshold(model_dir)
+        log.info("Using decision threshold %s", self.threshold)
+
+        # live counts start empty for every loaded model (a reload starts a new window)
+        self.drift = _load_drift_monitor(model_dir, self.feature_cols)
+
+        # built on the first /explain call (the "trees" backend has to read model.pkl for it)
+        self._explainer = None
+        self._explainer_lock = threading.Lock()
+
+    def explainer(self) -> Explainer:
+        if self._explainer is None:
+            with self._explainer_lock:
+                if self._explainer is None:
+                    self._explainer = Explainer.for_model(self)
+        return self._explainer
+
+
+# Loaded lazily (first request or the app's startup hook), never at import time
+_serving_model = None
+_load_lock = threading.Lock()
+
+# Directory and backend the process serves from: MODEL_DIR / SERVING_BACKEND unless the first
+# load_model call named others (scripts/serve_workers.py --shared_dir loads a shared directory
+# with the "trees" backend before forking, and its workers inherit it)
+_model_source = (MODEL_DIR, SERVING_BACKEND)
+
+
+# Load the model once; concurrent callers wait for the same load
+def load_model(model_dir: str = MODEL_DIR, backend: str = SERVING_BACKEND) -> ServingModel:
+    global _serving_model, _model_source
+    if _serving_model is None:
+        with _load_lock:
+            if _serving_model is None:
+                _serving_model = ServingModel(model_dir, backend)
+                _model_source = (model_dir, backend)
+    return _serving_model
+
+
+# (model_dir, backend) the app watches and /admin/reload reloads by default
+def model_source() -> tuple:
+    return _model_source
+
+
+# Current model, loading it on first use
+def get_model() -> ServingModel:
+    return _serving_model or load_model()
+
+
+# Hot reload: synthetic requests for warm-up, drawn from the values the encoder knows
+WARMUP_REQUESTS = int(os.environ.get("WARMUP_REQUESTS", "20"))
+WARMUP_BATCH_SIZE = 64
+
+def _synthetic_records(encoder: CompiledEncoder, n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    choices = {c: list(m) for c, (_, m) in encoder.binary_index.items()}
+    for (c, v) in encoder.onehot_index:
+        choices.setdefault(c, []).append(v)
+    records = []
+    for _ in range(n):
+        record = {c: float(rng.uniform(0, 100)) for c in encoder.numeric_cols}
+        record.update({c: values[rng.integers(len(values))] for c, values in choices.items()})
+        records.append(record)
+    return records
+
+# Score synthetic single requests and one batch on a model that is not serving yet
+# (bypasses _score so warm-up calls stay out of /metrics)
+def warm_up(m: ServingModel, n_requests: int = WARMUP_REQUESTS) -> dict:
+    records = _synthetic_records(m.encoder, max(n_requests, WARMUP_BATCH_SIZE))
+    latencies = []
+    for record in records[:n_requests]:
+        t0 = time.perf_counter()
+        m.backend.predict_proba(m.encoder.transform([record]))
+        latencies.append(time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    proba = np.asarray(m.backend.predict_proba(m.encoder.transform(records[:WARMUP_BATCH_SIZE]))).ravel()
+    batch_seconds = time.perf_counter() - t0
+    if len(proba) != WARMUP_BATCH_SIZE or not np.isfinite(proba).all():
+        raise ValueError("warm-up predictions are missing or not finite")
+    latencies = np.array(latencies or [0.0])
+    return {
+        "warmup_requests": n_requests,
+        "warmup_p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "warmup_max_ms": float(latencies.max() * 1000),
+        "warmup_first_ms": float(latencies[0] * 1000),
+        "warmup_batch_ms": batch_seconds * 1000,
+    }
+
+
+# last hot reload (reported by /admin/reload and /metrics)
+last_reload = {}
+_reload_lock = threading.Lock()
+
+# Load a model directory next to the serving one, warm it up, then swap the reference.
+# Requests already running keep the ServingModel they started with; the prediction cache
+# is invalidated by the model id change. Raises (old model keeps serving) when the load or
+# warm-up fails, RuntimeError when another reload is running.
+def reload_model(model_dir: str = MODEL_DIR, backend: str = SERVING_BACKEND) -> dict:
+    global _serving_model
+    if not _reload_lock.acquire(blocking=False):
+        raise RuntimeError("a model reload is already in progress")
+    try:
+        t0 = time.perf_counter()
+        try:
+            new_model = ServingModel(model_dir, backend)
+            load_seconds = time.perf_counter() - t0
+            warmup = warm_up(new_model)
+        except Exception:
+            MODEL_RELOADS["failed"].inc()
+            raise
+
+        t1 = time.perf_counter()
+        with _load_lock:
+            previous, _serving_model = _serving_model, new_model
+        swap_seconds = time.perf_counter() - t1
+        MODEL_RELOADS["ok"].inc()
+
+        last_reload.clear()
+        last_reload.update({
+            "model_dir": model_dir,
+            "model_id": new_model.model_id,
+            "previous_model_id": previous.model_id if previous is not None else None,
+            "backend": new_model.backend.name,
+            "load_seconds": load_seconds,
+            **warmup,
+            "swap_ms": swap_seconds * 1000,
+        })
+        log.info("Model swapped to %s", new_model.model_id, extra=dict(last_reload))
+        return dict(last_reload)
+    finally:
+        _reload_lock.release()
+
+
+# Files whose change means a new model was dropped into a directory (watched by the app)
+MODEL_FILES = ("MLmodel", "model.pkl", "feature_columns.txt", "preprocessing.pkl",
+               os.path.join("params", "threshold"), "tree_model.npz")
+
+def model_signature(model_dir: str = MODEL_DIR) -> tuple:
+    signature = [os.path.realpath(model_dir)]  # a symlink flip to another version counts too
+    for name in MODEL_FILES:
+        try:
+            st = os.stat(os.path.join(model_dir, name))
+            signature.append((name, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((name, None, None))
+    return tuple(signature)
 
-# binary feature mappings 
-BINARY_MAP = {
-    "gender": {"Female": 0, "Male": 1}, 
-    "Partner": {"No": 0, "Yes": 1},
-    "Dependents": {"No": 0, "Yes": 1},
-    "PhoneService": {"No": 0, "Yes": 1},
-    "PaperlessBilling": {"No": 0, "Yes": 1},
-}
 
-# numeric columns that need type coercion
-NUMERIC_COLS = ["tenure", "MonthlyCharges", "TotalCharges"]
+# True once the model is loaded and requests will not pay the load cost
+def is_ready() -> bool:
+    return _serving_model is not None
 
+
+# DataFrame transform aligned with the training schema (kept for DataFrame callers)
 def _serve_transform(df: pd.DataFrame) -> pd.DataFrame:
-    
-    df = df.copy()
-    
-    # clean column names
-    df.columns = df.columns.str.strip()
-    
-    # Numeric Type Coercion 
-    for c in NUMERIC_COLS:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")  #Convert to numeric, replacing invalid values with NaN
-            df[c] = df[c].fillna(0) # Fill NaN with 0
-    
-    # Binary Feature Encoding
-    # Apply deterministic mappings for binary features
-    for c, mapping in BINARY_MAP.items():
-        if c in df.columns:
-            df[c] = (
-                df[c]
-                .astype(str)
-                .str.strip()
-                .map(mapping)
-                .astype("Int64")
-                .fillna(0)
-                .astype(int)
-            )
-    
-    # One-Hot Encoding for Remaining Categorical Features
-    # Find remaining object/categorical columns
-    obj_cols = [c for c in df.select_dtypes(include=["object"]).columns]
-    if obj_cols:
-        # Apply one-hot encoding with drop_first=True
-        df = pd.get_dummies(df, columns=obj_cols, drop_first=True)
-    
-    # Boolean to Integer Conversion
-    bool_cols = df.select_dtypes(include=["bool"]).columns
-    if len(bool_cols) > 0:
-        df[bool_cols] = df[bool_cols].astype(int)
-    
-    # Feature Alignment with Training Schema
-    df = df.reindex(columns=FEATURE_COLS, fill_value=0)
-    
-    return df
+    m = get_model()
+    return pd.DataFrame(m.encoder.transform_frame(df), columns=m.feature_cols, index=df.index)
 
 
-# main prediction pipeline
-def predict(input_dict: dict) -> str:
-
-    # Convert Input to DataFrame
-    df = pd.DataFrame([input_dict])
-    
-    # Apply Feature Transformations
-    df_enc = _serve_transform(df)
-    
-    # Generate Model Prediction
+# Convert churn probabilities to business-friendly labels
+def _to_label(proba: float, threshold: float) -> str:
+    if proba >= threshold:
+        return "Likely to churn"      # High risk
+    else:
+        return "Not likely to churn"  # Low risk
+
+
+# Encode and score records with one model call (each stage timed into /metrics, and into
+# `trace` in milliseconds when the caller passes one for its request log)
+def _score(m: ServingModel, records: list, trace: dict = None) -> list:
+
+    # Encode straight into a float32 matrix (row order is preserved end to end)
+    t0 = time.perf_counter()
+    X = m.encoder.transform(records)
+    t1 = time.perf_counter()
+    STAGE_SECONDS["transform"].observe(t1 - t0)
+
+    # Generate Churn Probabilities (one model call per batch)
+    BATCH_ROWS.observe(len(records))
     try:
-        preds = model.predict(df_enc)
-        
-        # Normalize prediction output to consistent format
-        if hasattr(preds, "tolist"):
-            preds = preds.tolist()  # Convert numpy array to list
-            
-        # Extract single prediction value (for single-row input)
-        if isinstance(preds, (list, tuple)) and len(preds) == 1:
-            result = preds[0]
-        else:
-            result = preds
-            
+        proba = np.asarray(m.backend.predict_proba(X), dtype=np.float64).ravel()
     except Exception as e:
+        MODEL_ERRORS.inc()
         raise Exception(f"Model prediction failed: {e}")
-    
-    # Convert to Business-Friendly Output
-    if result == 1:
-        return "Likely to churn"      # High risk
-    else:
-        return "Not likely to churn"  # Low risk
\ No newline at end of file
+    t2 = time.perf_counter()
+    STAGE_SECONDS["predict"].observe(t2 - t1)
+
+    if len(proba) != len(records):
+        MODEL_ERRORS.inc()
+        raise Exception(f"Model returned {len(proba)} predictions for {len(records)} records")
+
+    results = [
+        {"prediction": _to_label(p, m.threshold), "churn_probability": p}
+        for p in proba.tolist()
+    ]
+    if m.drift is not None:
+        m.drift.update(X)  # rows served from the prediction cache are not counted
+    t3 = time.perf_counter()
+    STAGE_SECONDS["postprocess"].observe(t3 - t2)
+    if trace is not None:
+        trace["transform_ms"] = (t1 - t0) * 1000
+        trace["predict_ms"] = (t2 - t1) * 1000
+        trace["postprocess_ms"] = (t3 - t2) * 1000
+    return results
+
+
+# batch prediction pipeline: one transform and one model call for all records
+# (`trace` collects the model id, cache hits and stage timings for the request log; `m` is the
+# ServingModel the caller captured for its request, so labels and the reported threshold agree)
+def predict_batch(records: list, trace: dict = None, m: ServingModel = None) -> list:
+
+    if len(records) == 0:
+        return []
+
+    m = m or get_model()
+    PREDICTED_ROWS.inc(len(records))
+    if trace is not None:
+        trace["model_id"] = m.model_id
+    cache = prediction_cache
+    if cache is None:
+        return _score(m, records, trace)
+
+    # Cached rows skip both the transform and the model; only misses are scored
+    cache.check_model(m.model_id)
+    keys = [cache.key(r, m.encoder) for r in records]
+    results = [cache.get(k) for k in keys]
+
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        scored = _score(m, [records[i] for i in missing], trace)
+        keep = cache.model_id == m.model_id  # a reload swapped the model while this batch ran
+        for i, result in zip(missing, scored):
+            if keep:
+                cache.put(keys[i], result)
+            results[i] = result
+
+    if trace is not None:
+        trace["cache_hits"] = len(records) - len(missing)
+
+    # hand out copies so callers cannot alter cached entries
+    return [dict(r) for r in results]
+
+
+# Columnar prediction pipeline for bulk payloads (decoded Arrow / MessagePack columns): the
+# encoder works column by column and the whole frame is scored with one model call. Returns the
+# model used and the probability array; the per-record prediction cache is not consulted.
+def predict_columns(df: pd.DataFrame, trace: dict = None):
+
+    m = get_model()
+    t0 = time.perf_counter()
+    X = m.encoder.transform_frame(df)
+    t1 = time.perf_counter()
+    STAGE_SECONDS["transform"].observe(t1 - t0)
+
+    BATCH_ROWS.observe(len(X))
+    try:
+        proba = np.asarray(m.backend.predict_proba(X), dtype=np.float64).ravel()
+    except Exception as e:
+        MODEL_ERRORS.inc()
+        raise Exception(f"Model prediction failed: {e}")
+    t2 = time.perf_counter()
+    STAGE_SECONDS["predict"].observe(t2 - t1)
+    if m.drift is not None:
+        m.drift.update(X)
+
+    PREDICTED_ROWS.inc(len(X))
+    if trace is not None:
+        trace.update({"model_id": m.model_id, "transform_ms": (t1 - t0) * 1000, "predict_ms": (t2 - t1) * 1000})
+    return m, proba
+
+
+# Explanation pipeline: one encode, one pred_contribs call for the uncached rows and one model
+# call for the probabilities, top-k raw-field contributions (log-odds) per record, largest
+# magnitude first
+def explain_batch(records: list, top_k: int = DEFAULT_TOP_K, trace: dict = None,
+                  m: ServingModel = None) -> list:
+
+    if len(records) == 0:
+        return []
+
+    m = m or get_model()
+    explainer = m.explainer()
+    t0 = time.perf_counter()
+    X = m.encoder.transform(records)
+    t1 = time.perf_counter()
+    STAGE_SECONDS["transform"].observe(t1 - t0)
+
+    # cached vectors skip the TreeSHAP call
+    cache = explanation_cache
+    n_fields = len(explainer.fields)
+    field_contribs = np.empty((len(records), n_fields), dtype=np.float32)
+    bias = np.empty(len(records), dtype=np.float32)
+    missing = list(range(len(records)))
+    if cache is not None:
+        cache.check_model(m.model_id)
+        keys = [row.tobytes() for row in X]
+        missing = []
+        for i, key in enumerate(keys):
+            hit = cache.get(key)
+            if hit is None:
+                missing.append(i)
+            else:
+                field_contribs[i], bias[i] = hit
+    if missing:
+        contribs, base = explainer.contributions(X[missing])
+        field_contribs[missing], bias[missing] = contribs, base
+        if cache is not None and cache.model_id == m.model_id:
+            for j, i in enumerate(missing):
+                cache.put(keys[i], (contribs[j].copy(), float(base[j])))  # copy: no view of the batch array
+    t2 = time.perf_counter()
+
+    # probability and label from the serving backend, exactly as /predict scores the row;
+    # TreeSHAP only supplies the contributions
+    try:
+        proba = np.asarray(m.backend.predict_proba(X), dtype=np.float64).ravel()
+    except Exception as e:
+        MODEL_ERRORS.inc()
+        raise Exception(f"Model prediction failed: {e}")
+    t3 = time.perf_counter()
+    STAGE_SECONDS["predict"].observe(t3 - t2)
+
+    top = explainer.top_k(field_contribs, top_k)
+    top_values = np.take_along_axis(field_contribs, top, axis=1).tolist()
+
+    # Python objects are built from whole-array tolist() conversions, not per-element indexing
+    fields = explainer.fields
+    results = []
+    for record, p, b, idx, values in zip(records, proba.tolist(), bias.tolist(), top.tolist(), top_values):
+        results.append({
+            "prediction": _to_label(p, m.threshold),
+            "churn_probability": p,
+            "base_value": b,
+            "contributions": [
+                {"feature": fields[j], "value": record.get(fields[j]), "contribution": v}
+                for j, v in zip(idx, values)
+            ],
+        })
+    if trace is not None:
+        trace.update({"model_id": m.model_id, "transform_ms": (t1 - t0) * 1000,
+                      "explain_ms": (t2 - t1) * 1000, "predict_ms": (t3 - t2) * 1000,
+                      "cache_hits": len(records) - len(missing)})
+    return results
+
+
+# main prediction pipeline
+def predict(input_dict: dict, trace: dict = None) -> dict:
+
+    # Single record is a batch of one
+    return predict_batch([input_dict], trace)[0]
@@ -0,0 +1,144 @@
+### metrics.py
+
+# Imports
+import threading
+from bisect import bisect_left
+
+# Default latency buckets in seconds (50us .. 10s)
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+# Rows per model call
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+
+# Base for metrics whose values are sharded per thread: each thread only ever writes its
+# own shard, so the hot path takes no lock; shards are summed when /metrics is scraped
+class _ThreadSharded:
+
+    def __init__(self, name: str, help_text: str, labels: dict = None):
+        self.name = name
+        self.help = help_text
+        self.labels = labels or {}
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()  # only taken the first time a thread records
+        REGISTRY.register(self)
+
+    def _new_shard(self) -> list:
+        raise NotImplementedError
+
+    def _shard(self) -> list:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _label_str(self, extra: dict = None) -> str:
+        labels = {**self.labels, **(extra or {})}
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+
+
+# Monotonic counter
+class Counter(_ThreadSharded):
+
+    kind = "counter"
+
+    def _new_shard(self) -> list:
+        return [0.0]
+
+    def inc(self, amount: float = 1.0):
+        self._shard()[0] += amount
+
+    def value(self) -> float:
+        return sum(s[0] for s in list(self._shards))
+
+    def samples(self) -> list:
+        return [f"{self.name}{self._label_str()} {self.value():g}"]
+
+
+# Fixed-bucket histogram (Prometheus semantics: cumulative buckets, _sum and _count)
+class Histogram(_ThreadSharded):
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS, labels: dict = None):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help_text, labels)
+
+    def _new_shard(self) -> list:
+        # one count per bucket, one for +Inf, then the running sum
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value: float):
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def samples(self) -> list:
+        shards = list(self._shards)
+        counts = [sum(s[i] for s in shards) for i in range(len(self.buckets) + 1)]
+        total = sum(s[-1] for s in shards)
+
+        lines, cumulative = [], 0
+        for le, count in zip(list(self.buckets) + ["+Inf"], counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{self._label_str({'le': le})} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_str()} {total:g}")
+        lines.append(f"{self.name}_count{self._label_str()} {cumulative}")
+        return lines
+
+
+# Holds every metric plus collector callbacks for values owned elsewhere (e.g. cache stats)
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    # fn() returns a list of (name, kind, help, labels, value) tuples at scrape time
+    def register_collector(self, fn):
+        self._collectors.append(fn)
+
+    # Prometheus text exposition format (version 0.0.4)
+    def render(self) -> str:
+        families = {}
+        for metric in self._metrics:
+            families.setdefault(metric.name, (metric.kind, metric.help, []))[2].extend(metric.samples())
+        for fn in self._collectors:
+            for name, kind, help_text, labels, value in fn():
+                label_str = ""
+                if labels:
+                    label_str = "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+                families.setdefault(name, (kind, help_text, []))[2].append(f"{name}{label_str} {value:g}")
+
+        lines = []
+        for name, (kind, help_text, samples) in families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# Serving metrics shared by src/serving/inference.py and src/app/main.py
+STAGES = ("parse", "validate", "transform", "predict", "postprocess")
+STAGE_SECONDS = {
+    stage: Histogram("churn_stage_seconds", "Time spent per prediction stage", labels={"stage": stage})
+    for stage in STAGES
+}
+BATCH_ROWS = Histogram("churn_batch_rows", "Rows scored per model call", buckets=BATCH_SIZE_BUCKETS)
+PREDICTED_ROWS = Counter("churn_predicted_rows_total", "Rows returned by the prediction pipeline")
+MODEL_ERRORS = Counter("churn_model_errors_total", "Failed model calls")
+MODEL_RELOADS = {r: Counter("churn_model_reloads_total", "Hot model reloads", {"result": r})
+                 for r in ("ok", "failed")}
@@ -0,0 +1,39 @@
+### shared.py
+
+# Imports
+import os
+import shutil
+from src.serving.backends import TREE_MODEL_FILE, TREE_TABLES_DIR
+from src.serving.drift import DRIFT_REFERENCE_FILE
+from src.serving.tree_model import TreeEnsemble
+
+# files a worker needs besides the tree tables (encoder schema and fitted encoder, decision
+# threshold, model id, the drift monitor's training snapshot, and the pickled model /explain
+# reads TreeSHAP contributions from)
+SHARED_FILES = ["feature_columns.txt", "preprocessing.pkl", os.path.join("params", "threshold"),
+                DRIFT_REFERENCE_FILE, "model.pkl", "MLmodel"]
+
+
+# Lay out a model directory whose tree tables are plain .npy files, so that every worker
+# scoring with the "trees" backend memory-maps the same read-only pages instead of
+# unpickling its own copy. Point out_dir at /dev/shm to keep the tables in RAM.
+# Exporting a new model into a directory that workers serve from (and watch, see
+# MODEL_WATCH_INTERVAL) is safe: every file is replaced, never rewritten in place, and the
+# tables go first so the metadata files that signal a new model change last.
+def export_shared_model(model_dir: str, out_dir: str) -> str:
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    ensemble = TreeEnsemble.load(os.path.join(model_dir, TREE_MODEL_FILE))
+    ensemble.save_tables(os.path.join(out_dir, TREE_TABLES_DIR))
+
+    for name in SHARED_FILES:
+        src, dst = os.path.join(model_dir, name), os.path.join(out_dir, name)
+        if os.path.exists(src):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copyfile(src, dst + ".tmp")
+            os.replace(dst + ".tmp", dst)
+        elif os.path.exists(dst):
+            os.remove(dst)  # left over from a previously exported model
+
+    return out_dir
@@ -0,0 +1,133 @@
+### tree_model.py
+
+# Imports
+import os
+import numpy as np
+
+# Rows scored per block so the (rows x trees) work arrays stay small on large batches
+BLOCK_ROWS = 4096
+
+
+# Pure-NumPy scorer for a tree ensemble exported by src/models/export_trees.py (no xgboost import)
+class TreeEnsemble:
+
+    def __init__(self, arrays: dict):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.default_left = arrays["default_left"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.base_margin = np.float32(arrays["base_margin"])
+        self.max_depth = int(arrays["max_depth"])
+        self.n_features = int(arrays["n_features"])
+        self.n_trees = len(self.roots)
+
+        # children[2 * node] is the left child, children[2 * node + 1] the right one
+        if "children" in arrays:
+            self.children = arrays["children"]
+        else:
+            self.children = np.stack([self.left, self.right], axis=1).ravel()
+
+        # single-row path: pointer-sized copies so the per-call gathers need no index casts
+        self._feature_ip = np.asarray(self.feature, dtype=np.intp)
+        self._children_ip = np.asarray(self.children, dtype=np.intp)
+        self._roots_ip = np.asarray(self.roots, dtype=np.intp)
+
+    # Load from the exported .npz, or from a directory of .npy tables which are memory-mapped
+    # read-only so every process scoring from it shares the same pages
+    @classmethod
+    def load(cls, path: str) -> "TreeEnsemble":
+        if os.path.isdir(path):
+            return cls({
+                f[:-len(".npy")]: np.load(os.path.join(path, f), mmap_mode="r")
+                for f in os.listdir(path) if f.endswith(".npy")
+            })
+        with np.load(path) as data:
+            return cls({k: data[k] for k in data.files})
+
+    # Write one .npy per array so the tables can be memory-mapped by load(). Each file is written
+    # under a temporary name and renamed, so processes still mapping the old tables keep them.
+    def save_tables(self, out_dir: str) -> str:
+        os.makedirs(out_dir, exist_ok=True)
+        arrays = {
+            "feature": self.feature, "threshold": self.threshold,
+            "left": self.left, "right": self.right,
+            "default_left": self.default_left, "value": self.value, "roots": self.roots,
+            "children": self.children,
+            "base_margin": np.float64(self.base_margin), "max_depth": np.int32(self.max_depth),
+            "n_features": np.int32(self.n_features),
+        }
+        for name, arr in arrays.items():
+            path = os.path.join(out_dir, f"{name}.npy")
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, np.asarray(arr))
+            os.replace(path + ".tmp", path)
+        return out_dir
+
+    # Walk every tree at once: one gather/compare step per tree level
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+
+        # flat feature offsets so each level is a single 1-D gather on the raveled input
+        flat = X.ravel()
+        row_offset = (np.arange(X.shape[0], dtype=np.intp) * X.shape[1])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+
+        for _ in range(self.max_depth):
+            x = np.take(flat, row_offset + np.take(self.feature, node))
+            go_right = ~(x < np.take(self.threshold, node))
+            missing = np.isnan(x)
+            if missing.any():
+                go_right[missing] = ~np.take(self.default_left, node)[missing]
+            node = np.take(self.children, 2 * node + go_right)
+
+        return node
+
+    # One row (the /predict hot path): every node's split is decided with one gather and compare
+    # over the flat node table (leaves read feature 0 and loop to themselves), then each level is
+    # one lookup in that decision vector. About 4x fewer NumPy calls than the level walk above.
+    def _margin_one(self, x: np.ndarray) -> np.float32:
+
+        xv = x[self._feature_ip]
+        go_right = ~(xv < self.threshold)
+        missing = np.isnan(xv)
+        if missing.any():
+            go_right[missing] = ~self.default_left[missing]
+        go_right = go_right.view(np.int8)
+
+        node = self._roots_ip
+        for _ in range(self.max_depth):
+            node = self._children_ip[2 * node + go_right[node]]
+
+        # same float32 summation order as predict_margin's block path
+        leaves = self.value[node]
+        leaves[0] += self.base_margin
+        return np.cumsum(leaves, dtype=np.float32)[-1]
+
+    # Raw margin (log-odds) per row
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected input with {self.n_features} columns, got shape {X.shape}")
+
+        if X.shape[0] == 1:
+            return np.array([self._margin_one(X[0])], dtype=np.float32)
+
+        margin = np.empty(X.shape[0], dtype=np.float32)
+        for start in range(0, X.shape[0], BLOCK_ROWS):
+            leaves = np.take(self.value, self._leaves(X[start:start + BLOCK_ROWS]))
+            # float32 running sum seeded with the base margin, then the trees in order
+            # (xgboost's CPU predictor fills the output with the base margin and adds each tree)
+            leaves[:, 0] += self.base_margin
+            margin[start:start + BLOCK_ROWS] = np.cumsum(leaves, axis=1, dtype=np.float32)[:, -1]
+
+        return margin
+
+    # Churn probability (class 1) per row
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        # float32 sigmoid as in xgboost, with exp rounded from float64 to stay within 1 ulp of expf
+        margin = self.predict_margin(X)
+        e = np.exp(-margin.astype(np.float64)).astype(np.float32)
+        return np.float32(1.0) / (np.float32(1.0) + e)
@@ -1,17 +1,246 @@
 ### utils.py
 
 ### Imports
+import os
+import sys
+import json
+import time
+import queue
+import atexit
 import logging
+import itertools
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Logging configuration (environment): level, destination (stderr when unset), "json" lines or
+# "text", and request-log sampling: keep 1 in round(1 / LOG_SAMPLE_RATE) request records and at
+# most LOG_MAX_PER_SECOND of them per second (0 = no cap). Warnings and errors are never sampled.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FILE = os.environ.get("LOG_FILE")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+LOG_SAMPLE_RATE = float(os.environ.get("LOG_SAMPLE_RATE", "1"))
+LOG_MAX_PER_SECOND = int(os.environ.get("LOG_MAX_PER_SECOND", "0"))
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+ROOT_LOGGER = "churn"
+
+# attributes every LogRecord has; anything else came in through extra= and goes into the JSON line
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+# One JSON object per line: ts, level, logger, msg plus the extra= fields
+# (request_id, model_id, stage timings, ...)
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                out[key] = value
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, default=str)
+
+
+# QueueHandler that enqueues the record untouched: message formatting and JSON encoding
+# happen on the listener thread instead of the request thread
+class _DeferredQueueHandler(QueueHandler):
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# Cheap keep/drop decision taken before a log record is built: deterministic 1-in-N plus an
+# optional per-second cap for high-QPS periods. Counters are shared across threads without a
+# lock, so the cap is approximate under contention.
+class Sampler:
+
+    def __init__(self, rate: float = 1.0, max_per_second: int = 0):
+        self.every = 0 if rate <= 0 else max(1, round(1 / rate))
+        self.max_per_second = max_per_second
+        self._seen = itertools.count()
+        self._window = 0
+        self._kept = 0
+        self.dropped = 0
+
+    def __call__(self) -> bool:
+        if self.every == 0 or (self.every > 1 and next(self._seen) % self.every):
+            self.dropped += 1
+            return False
+        if self.max_per_second:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._kept = window, 0
+            if self._kept >= self.max_per_second:
+                self.dropped += 1
+                return False
+            self._kept += 1
+        return True
+
+
+# QueueListener that also accepts the plain tuples EventLogger enqueues and turns them into
+# LogRecords on the writer thread
+class _Listener(QueueListener):
+
+    def dequeue(self, block: bool):
+        item = self.queue.get(block)
+        if type(item) is tuple:
+            created, levelno, name, msg, fields = item
+            item = logging.makeLogRecord({**fields, "name": name, "levelno": levelno,
+                                          "levelname": logging.getLevelName(levelno),
+                                          "msg": msg, "created": created})
+        return item
+
+
+# The writer thread starts with the first record, not at import (importing the app or the
+# training modules starts no thread), and is rebuilt in forked children: a fork copies the
+# queue but not the thread that drains it (see _after_fork_in_child).
+_listener = None
+_queue = None
+_started = False
+_settings = None
+_start_lock = threading.Lock()
+
+# Queue handler of the "churn" tree: starts the writer thread on first use
+class _LazyQueueHandler(_DeferredQueueHandler):
+
+    def enqueue(self, record: logging.LogRecord):
+        if not _started:
+            _start_listener()
+        self.queue.put_nowait(record)
+
+def _start_listener():
+    global _started
+    with _start_lock:
+        if not _started and _listener is not None:
+            _listener.start()
+            _started = True
+
+# Route the "churn" logger tree through a queue drained by one background writer thread.
+# Safe to call again (e.g. with a log file), the previous listener is flushed and replaced.
+# start=False leaves the thread to the first logged record.
+def setup_logging(level: str = LOG_LEVEL, log_file: str = LOG_FILE, fmt: str = LOG_FORMAT,
+                  start: bool = True) -> QueueListener:
+    global _listener, _queue, _settings
+
+    handler = logging.FileHandler(log_file) if log_file else logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger(ROOT_LOGGER)
+    logger.setLevel(level)
+    logger.propagate = False
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.addHandler(_LazyQueueHandler(log_queue))
+
+    _stop_listener()  # writes out whatever the old queue still holds
+    _listener = _Listener(log_queue, handler)
+    _queue = log_queue
+    _settings = (level, log_file, fmt)
+    if start:
+        _start_listener()
+    return _listener
+
+def _stop_listener():
+    global _started
+    with _start_lock:
+        if _started:
+            _listener.stop()
+            _started = False
+
+# Flush queued records and stop the writer threads (also run at interpreter exit; processes
+# leaving through os._exit, such as forked workers, call it themselves)
+def stop_logging():
+    _stop_listener()
+    for name, (handler, listener, log_file, level) in list(_file_loggers.items()):
+        if listener._thread is not None:
+            listener.stop()
+
+atexit.register(stop_logging)
+
+
+# Logger under the "churn" tree, configured from the environment on first use
+def get_logger(name: str) -> logging.Logger:
+    if _queue is None:
+        setup_logging(start=False)
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+# Hot-path logger: an event is one tuple put on the queue (no LogRecord, no formatting,
+# no caller lookup on the request thread); the writer thread builds the record
+class EventLogger:
+
+    def __init__(self, name: str):
+        self.logger = get_logger(name)
+        self.name = self.logger.name
+
+    def log(self, level: int, msg: str, fields: dict):
+        if self.logger.isEnabledFor(level):
+            if not _started:
+                _start_listener()
+            _queue.put((time.time(), level, self.name, msg, fields))
+
+    def info(self, msg: str, fields: dict):
+        return self.log(logging.INFO, msg, fields)
+
+    def warning(self, msg: str, fields: dict):
+        return self.log(logging.WARNING, msg, fields)
+
+
+# Sampler for per-request records (the serving endpoints check it before logging)
+request_sampler = Sampler(LOG_SAMPLE_RATE, LOG_MAX_PER_SECOND)
+
+
+# helps log actions (kept for callers that want a named logger writing to its own file;
+# the file is written by the background listener, not the calling thread)
+_file_loggers = {}
 
-# helps log actions
 def setup_logger(name: str, log_file: str, level=logging.INFO):
+    old = _file_loggers.get(name)
+    if old is not None and old[1]._thread is not None:
+        old[1].stop()
+    return _open_file_logger(name, log_file, level)
 
-    handler = logging.FileHandler(log_file)        
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+def _open_file_logger(name: str, log_file: str, level):
+
+    handler = logging.FileHandler(log_file)
+    formatter = logging.Formatter(TEXT_FORMAT)
     handler.setFormatter(formatter)
 
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    logger.addHandler(handler)
+    old = _file_loggers.get(name)
+    if old is not None:
+        logger.removeHandler(old[0])
+    queue_handler = _DeferredQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+    _file_loggers[name] = (queue_handler, listener, log_file, level)
+
+    return logger
+
+
+# In a forked child the writer threads are gone and the inherited queues would only fill up:
+# give the child fresh queues and listeners (records the parent had not written yet stay
+# with the parent). The "churn" writer starts again with the child's first record.
+def _after_fork_in_child():
+    global _listener, _started, _start_lock
+    _start_lock = threading.Lock()
+    _started = False
+    if _settings is not None:
+        _listener = None
+        setup_logging(*_settings, start=False)
+    for name, (handler, listener, log_file, level) in list(_file_loggers.items()):
+        _open_file_logger(name, log_file, level)
 
-    return logger
\ No newline at end of file
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
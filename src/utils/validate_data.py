@@ -2,82 +2,205 @@
 
 
 ### Imports
-import pandera as pa
+import numpy as np
 import pandas as pd
+from src.serving.utils import get_logger
 
-# validate data function: checks for valid inputs
-def validate_telco_data(df: pd.DataFrame):
-    print("Starting data validation with Pandera...")
-    
-    # Define the schema mapping all original Great Expectations logic
-    schema = pa.DataFrameSchema(
-        columns={
-            # Original: expect_column_to_exist + expect_column_values_to_not_be_null
-            "customerID": pa.Column(str, nullable=False, required=True),
-            
-            # Original: expect_column_values_to_be_in_set
-            "gender": pa.Column(str, checks=pa.Check.isin(["Male", "Female"])),
-            "Partner": pa.Column(str, checks=pa.Check.isin(["Yes", "No"])),
-            "Dependents": pa.Column(str, checks=pa.Check.isin(["Yes", "No"])),
-            "PhoneService": pa.Column(str, checks=pa.Check.isin(["Yes", "No"])),
-            "InternetService": pa.Column(str, checks=pa.Check.isin(["DSL", "Fiber optic", "No"])),
-            "Contract": pa.Column(str, checks=pa.Check.isin(["Month-to-month", "One year", "Two year"])),
-            
-            # Original: expect_column_values_to_be_between (0, 120)
-            "tenure": pa.Column(int, checks=pa.Check.in_range(0, 120), nullable=False),
-            
-            # Original: expect_column_values_to_be_between (0, 200)
-            "MonthlyCharges": pa.Column(float, checks=pa.Check.in_range(0, 200), nullable=False),
-            
-            # RAW DATA HANDLING: 
-            # Original code expected numeric, but Raw CSV has strings for TotalCharges.
-            # We check for existence and non-nullity here. 
-            "TotalCharges": pa.Column(pa.Object, nullable=False, required=True),
-            
-            "Churn": pa.Column(str, checks=pa.Check.isin(["Yes", "No"]), required=True),
-        },
-        # Check: expect_column_pair_values_A_to_be_greater_than_B
-        # We wrap this in a try/except or a 'mostly' logic if needed.
-        # Note: This only works if TotalCharges is numeric. 
-        # Since we are validating RAW data, we skip the cross-column check here 
-        # and move it to a 'post-preprocess' check or use the 'mostly' parameter.
-        checks=[
-            # This replicates the 'mostly=0.95' logic for A >= B
-            pa.Check(
-                lambda d: pd.to_numeric(d["TotalCharges"], errors="coerce") >= d["MonthlyCharges"],
-                name="TotalCharges_ge_MonthlyCharges",
-                ignore_na=True,
-                raise_warning=True # Set to True to mimic 'mostly' behavior if it's not a hard fail
-            )
-        ] if df["TotalCharges"].dtype != object else [],
-        
-        strict=False # Allows extra columns if they exist
-    )
-
-    try:
-        # lazy=True ensures we get ALL failures, not just the first one
-        schema.validate(df, lazy=True)
-        print("Data validation PASSED")
-        return True, []
-        
-    except pa.errors.SchemaErrors as err:
-        # FIXING THE TYPEERROR: access attributes via dot notation, not brackets
-        failed_checks = []
-        
-        # 1. Capture Schema/Column errors
-        if err.schema_errors:
-            for e in err.schema_errors:
-                col = e.column if e.column else "General"
-                check = e.check if e.check else "Type/Presence"
-                failed_checks.append(f"{col}: {check}")
-        
-        # 2. Capture Data-level (Check) errors
-        if err.failure_cases is not None:
-            check_failures = err.failure_cases["check"].unique().tolist()
-            failed_checks.extend(check_failures)
-
-        # Clean up the list to keep it unique
-        failed_checks = list(set(failed_checks))
-        
-        print(f"Data validation FAILED: {len(failed_checks)} issues found.")
-        return False, failed_checks
\ No newline at end of file
+log = get_logger("validation")
+
+# Allowed values (original Great Expectations expect_column_values_to_be_in_set)
+ALLOWED_VALUES = {
+    "gender": ["Male", "Female"],
+    "Partner": ["Yes", "No"],
+    "Dependents": ["Yes", "No"],
+    "PhoneService": ["Yes", "No"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "Churn": ["Yes", "No"],
+}
+
+# Inclusive ranges (original expect_column_values_to_be_between)
+RANGES = {
+    "tenure": (0, 120),
+    "MonthlyCharges": (0, 200),
+}
+
+# Columns that must exist / must not be missing. TotalCharges may be blank (new customers,
+# filled with 0 by preprocess_data), Churn is only required when validating training data.
+REQUIRED = ["customerID", "gender", "Partner", "Dependents", "PhoneService", "InternetService",
+            "Contract", "tenure", "MonthlyCharges", "TotalCharges"]
+NOT_NULL = ["customerID", "gender", "Partner", "Dependents", "PhoneService", "InternetService",
+            "Contract", "tenure", "MonthlyCharges"]
+
+# expect_column_pair_values_A_to_be_greater_than_B with mostly=0.95
+PAIR_CHECK = ("TotalCharges", "MonthlyCharges", 0.95)
+PAIR_CHECK_NAME = "TotalCharges_ge_MonthlyCharges"
+
+# rows reported per failed check
+MAX_FAILED_ROWS = 100
+
+
+# Rows whose (stripped) value is outside `allowed`, missing values are left to the not_null check.
+# Only the distinct values are compared, rows are resolved with one lookup.
+def _not_in_set(s: pd.Series, allowed: frozenset) -> np.ndarray:
+    codes, uniques = pd.factorize(s)
+    ok = np.fromiter((str(u).strip() in allowed for u in uniques), dtype=bool, count=len(uniques))
+    ok = np.append(ok, True)  # factorize marks missing values with -1, i.e. the last slot
+    return ~ok[codes]
+
+
+# Validator compiled once from the rule tables: every check is a NumPy boolean mask,
+# so a frame is validated in a few vectorized passes per column
+class TelcoValidator:
+
+    def __init__(self, allowed: dict = ALLOWED_VALUES, ranges: dict = RANGES, required: list = REQUIRED,
+                 not_null: list = NOT_NULL, pair_check: tuple = PAIR_CHECK, max_failed_rows: int = MAX_FAILED_ROWS):
+        self.allowed = {c: frozenset(v) for c, v in allowed.items()}
+        self.ranges = dict(ranges)
+        self.required = list(required)
+        self.not_null = list(not_null)
+        self.pair_check = pair_check
+        self.max_failed_rows = max_failed_rows
+
+        # name -> (column, mask function) for the row-level checks
+        self._checks = []
+        for col in self.not_null:
+            self._checks.append((f"{col}: not_null", col, lambda s: s.isna().to_numpy()))
+        for col, values in self.allowed.items():
+            self._checks.append((f"{col}: isin", col, lambda s, v=values: _not_in_set(s, v)))
+        for col, (lo, hi) in self.ranges.items():
+            self._checks.append((f"{col}: numeric", col, self._not_numeric))
+            self._checks.append((f"{col}: in_range({lo}, {hi})", col,
+                                 lambda s, lo=lo, hi=hi: self._out_of_range(s, lo, hi)))
+
+    @staticmethod
+    def _not_numeric(s: pd.Series) -> np.ndarray:
+        return (pd.to_numeric(s, errors="coerce").isna() & s.notna()).to_numpy()
+
+    @staticmethod
+    def _out_of_range(s: pd.Series, lo: float, hi: float) -> np.ndarray:
+        x = pd.to_numeric(s, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        with np.errstate(invalid="ignore"):
+            return (x < lo) | (x > hi)  # NaN compares False, missing values are not_null's job
+
+    # Validate one frame (optionally a random sample of `sample` rows, or a fraction if < 1).
+    # Returns {"valid", "rows", "invalid_rows" (rows failing at least one check),
+    #          "failures": {check: count}, "failed_rows": {check: [index labels]}, "warnings": {check: count}}
+    def validate(self, df: pd.DataFrame, sample: float = None, seed: int = 42) -> dict:
+
+        if sample:
+            if sample < 1:
+                df = df.sample(frac=sample, random_state=seed)
+            elif sample < len(df):
+                df = df.sample(n=int(sample), random_state=seed)
+
+        report = {"valid": True, "rows": len(df), "invalid_rows": 0, "failures": {}, "failed_rows": {},
+                  "warnings": {}}
+        columns = set(df.columns)
+        index = df.index.to_numpy()
+        invalid = np.zeros(len(df), dtype=bool)
+
+        for col in self.required:
+            if col not in columns:
+                report["failures"][f"{col}: required"] = len(df)
+                report["failed_rows"][f"{col}: required"] = []
+                invalid[:] = True
+
+        for name, col, mask_fn in self._checks:
+            if col not in columns:
+                continue
+            mask = mask_fn(df[col])
+            count = int(mask.sum())
+            if count:
+                report["failures"][name] = count
+                report["failed_rows"][name] = index[np.flatnonzero(mask)[:self.max_failed_rows]].tolist()
+                invalid |= mask
+
+        # Cross-column check on numeric values (raw TotalCharges is text), a failure only when
+        # fewer than `mostly` of the comparable rows pass
+        a, b, mostly = self.pair_check or (None, None, None)
+        if a in columns and b in columns:
+            x = pd.to_numeric(df[a], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            y = pd.to_numeric(df[b], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            comparable = ~(np.isnan(x) | np.isnan(y))
+            mask = comparable & (x < y)
+            count = int(mask.sum())
+            if count:
+                target = report["warnings"]
+                if count > (1 - mostly) * comparable.sum():
+                    target = report["failures"]
+                    report["failed_rows"][PAIR_CHECK_NAME] = index[np.flatnonzero(mask)[:self.max_failed_rows]].tolist()
+                    invalid |= mask
+                target[PAIR_CHECK_NAME] = count
+
+        report["invalid_rows"] = int(invalid.sum())
+        report["valid"] = not report["failures"]
+        return report
+
+    # Validate a stream of chunks (e.g. load_data(..., chunksize=N)) and merge the reports.
+    # The pair check is applied per chunk.
+    def validate_chunks(self, chunks, sample: float = None, seed: int = 42) -> dict:
+        total = {"valid": True, "rows": 0, "invalid_rows": 0, "failures": {}, "failed_rows": {}, "warnings": {}}
+        for chunk in chunks:
+            report = self.validate(chunk, sample=sample, seed=seed)
+            total["rows"] += report["rows"]
+            total["invalid_rows"] += report["invalid_rows"]
+            for key in ("failures", "warnings"):
+                for name, count in report[key].items():
+                    total[key][name] = total[key].get(name, 0) + count
+            for name, rows in report["failed_rows"].items():
+                kept = total["failed_rows"].setdefault(name, [])
+                kept.extend(rows[:self.max_failed_rows - len(kept)])
+        total["valid"] = not total["failures"]
+        return total
+
+    # Row-level checks for request records (dicts) on the serving path, without building a frame.
+    # Returns [(row position, [failed check names]), ...] for the invalid records only.
+    def validate_records(self, records: list) -> list:
+        errors = []
+        for i, record in enumerate(records):
+            failed = []
+            for col, values in self.allowed.items():
+                if col in record and str(record[col]).strip() not in values:
+                    failed.append(f"{col}: isin")
+            for col, (lo, hi) in self.ranges.items():
+                if col in record:
+                    try:
+                        value = float(record[col])
+                    except (TypeError, ValueError):
+                        failed.append(f"{col}: numeric")
+                        continue
+                    if not lo <= value <= hi:
+                        failed.append(f"{col}: in_range({lo}, {hi})")
+            if failed:
+                errors.append((i, failed))
+        return errors
+
+
+# compiled once at import, shared by training and serving
+telco_validator = TelcoValidator()
+# request payloads (no customerID, no training-data pair check): the same value / range checks
+# as validate_records, applied to whole columns
+request_validator = TelcoValidator(required=[], not_null=[], pair_check=None)
+
+# Validate and log a summary, returning the full report (per-check counts and row indices)
+def validate_telco_report(df: pd.DataFrame, sample: float = None) -> dict:
+    log.info("Starting data validation...")
+
+    report = telco_validator.validate(df, sample=sample)
+    for name, count in report["warnings"].items():
+        log.warning("%s failed on %d rows (within tolerance)", name, count, extra={"check": name})
+
+    if report["valid"]:
+        log.info("Data validation PASSED (%d rows)", report["rows"])
+    else:
+        log.error("Data validation FAILED: %d issues found.", len(report["failures"]),
+                  extra={"failures": report["failures"]})
+        for name, count in report["failures"].items():
+            log.error("   %s: %d rows (e.g. index %s)", name, count, report["failed_rows"][name][:5])
+    return report
+
+# validate data function: checks for valid inputs, returns (passed, failed check names)
+def validate_telco_data(df: pd.DataFrame, sample: float = None):
+    report = validate_telco_report(df, sample=sample)
+    return report["valid"], list(report["failures"])